@@ -1,3 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from .models import Author, Book, Library
+from .roles import get_role, set_role
+
+
+class ListBooksQueryCountTests(TestCase):
+    """
+    The catalogue must cost the same number of queries whatever the
+    number of books or authors on the page.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = Author.objects.bulk_create(Author(name=f"Author {i}") for i in range(60))
+        Book.objects.bulk_create(
+            Book(title=f"Book {i:03}", author=cls.authors[i % len(cls.authors)]) for i in range(120)
+        )
+
+    def test_page_queries_are_constant(self):
+        # COUNT for the paginator + one joined query for the rows
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('list_books'))
+        self.assertEqual(len(response.context['books']), 50)
+        self.assertContains(response, "by <a href")
+
+        Book.objects.bulk_create(Book(title=f"More {i}", author=self.authors[i]) for i in range(60))
+        with self.assertNumQueries(2):
+            self.client.get(reverse('list_books'), {'sort': '-author', 'page': 2})
+
+    def test_filter_by_author(self):
+        author = self.authors[0]
+        # + the author lookup
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('list_books'), {'author': author.pk})
+        self.assertEqual(
+            [book.title for book in response.context['books']],
+            list(author.book_set.order_by('title').values_list('title', flat=True)),
+        )
+
+    def test_unknown_author_is_404(self):
+        self.assertEqual(self.client.get(reverse('list_books'), {'author': 'x'}).status_code, 404)
+        self.assertEqual(self.client.get(reverse('list_books'), {'author': 999}).status_code, 404)
+
+
+class LibraryDetailQueryCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        authors = Author.objects.bulk_create(Author(name=f"Author {i}") for i in range(30))
+        books = Book.objects.bulk_create(Book(title=f"Book {i:03}", author=authors[i % 30]) for i in range(120))
+        cls.library = Library.objects.create(name="Central")
+        cls.library.books.set(books)
+
+    def test_holdings_page_queries_are_constant(self):
+        url = reverse('library_detail', args=[self.library.pk])
+        # The library with its holdings count + one page of books and authors
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertContains(response, "Books in Library (120)")
+        self.assertEqual(len(response.context['library'].holdings_page), 50)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'page': 3})
+        self.assertEqual(
+            [book.title for book in response.context['library'].holdings_page],
+            [f"Book {i:03}" for i in range(100, 120)],
+        )
+
+    def test_empty_library(self):
+        library = Library.objects.create(name="Empty")
+        response = self.client.get(reverse('library_detail', args=[library.pk]))
+        self.assertContains(response, "Books in Library (0)")
+
+
+class RoleRequiredTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='reader', password='pw')
+        self.client.force_login(self.user)
+
+    def test_users_default_to_member_without_a_profile_write(self):
+        with self.assertNumQueries(1):
+            get_user_model().objects.create_user(username='other', password='pw')
+        self.assertEqual(get_role(self.user), 'Member')
+
+    def test_role_check_costs_no_extra_query(self):
+        set_role(self.user, 'Admin')
+        # The session + the user joined with its profile
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('admin_view'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_role_change_takes_effect(self):
+        self.assertEqual(self.client.get(reverse('librarian_view')).status_code, 302)
+        set_role(self.user, 'Librarian')
+        self.assertEqual(self.client.get(reverse('librarian_view')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('member_view')).status_code, 302)
+
+    def test_cached_role_is_invalidated(self):
+        # Users not loaded through the backend read the role from the cache
+        fetch_user = lambda: get_user_model().objects.get(pk=self.user.pk)  # noqa: E731
+        self.assertEqual(get_role(fetch_user()), 'Member')
+        user = fetch_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_role(user), 'Member')
+        set_role(self.user, 'Admin')
+        self.assertEqual(get_role(fetch_user()), 'Admin')
+
+    def test_anonymous_is_redirected_to_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('member_view')).status_code, 302)
@@ -1,3 +1,88 @@
-from django.test import TestCase
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from .authentication import TokenCache, token_cache
 
 # Create your tests here.
+class TokenCacheTests(APITestCase):
+  """
+  Token -> user resolution is cached, and revoking a token or disabling
+  its user takes effect on the next request.
+  """
+
+  def setUp(self):
+    cache.clear()
+    token_cache.clear()
+    self.user = User.objects.create_user('alice', password='pw')
+    self.token = Token.objects.create(user=self.user)
+    self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+  def books_queries(self):
+    with CaptureQueriesContext(connection) as queries:
+      response = self.client.get(reverse('book-list'))
+    self.assertEqual(response.status_code, 200)
+    return len(queries)
+
+  def shared_tier(self):
+    # 'default' is LocMem here: shared only because the test is one process
+    patcher = mock.patch.object(token_cache, 'cache_alias', 'default')
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def test_no_shared_tier_by_default(self):
+    self.assertIsNone(token_cache.shared)
+
+  def test_hits_skip_the_token_query(self):
+    cold = self.books_queries()
+    self.assertEqual(self.books_queries(), cold - 1)
+    # Without a shared tier a fresh worker goes back to the database
+    token_cache.clear()
+    self.assertEqual(self.books_queries(), cold)
+
+  def test_fresh_worker_is_served_from_shared_tier(self):
+    self.shared_tier()
+    cold = self.books_queries()
+    token_cache.clear()
+    self.assertEqual(self.books_queries(), cold - 1)
+
+  def test_deleted_token_is_revoked(self):
+    self.books_queries()
+    self.token.delete()
+    self.assertEqual(self.client.get(reverse('book-list')).status_code, 401)
+
+  def test_revocation_reaches_other_workers_through_shared_cache(self):
+    self.shared_tier()
+    other_worker = TokenCache(local_ttl=0, cache_alias='default')
+    key = self.token.key
+    self.books_queries()
+    self.assertIsNotNone(other_worker.get(key))
+    self.token.delete()
+    self.assertIsNone(other_worker.get(key))
+
+  def test_inactive_user_is_rejected(self):
+    self.books_queries()
+    self.user.is_active = False
+    self.user.save()
+    self.assertEqual(self.client.get(reverse('book-list')).status_code, 401)
+    self.assertIsNone(token_cache.get(self.token.key))
+
+  def test_password_change_drops_entry(self):
+    self.books_queries()
+    self.user.set_password('new')
+    self.user.save()
+    self.assertIsNone(token_cache.get(self.token.key))
+
+  def test_regenerated_token_replaces_old_key(self):
+    self.books_queries()
+    self.token.delete()
+    new = Token.objects.create(user=self.user)
+    self.assertEqual(self.client.get(reverse('book-list')).status_code, 401)
+    self.client.credentials(HTTP_AUTHORIZATION=f'Token {new.key}')
+    self.assertEqual(self.client.get(reverse('book-list')).status_code, 200)
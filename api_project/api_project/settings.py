@@ -44,7 +44,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
   'DEFAULT_AUTHENTICATION_CLASSES': [
-    'rest_framework.authentication.TokenAuthentication',
+    'api.authentication.CachedTokenAuthentication',
     'rest_framework.authentication.SessionAuthentication',
   ],
   'DEFAULT_PERMISSION_CLASSES': [
@@ -52,6 +52,18 @@ REST_FRAMEWORK = {
   ],
 }
 
+# Token -> user lookups cached by api.authentication.CachedTokenAuthentication.
+# Other workers keep accepting a revoked token for up to LOCAL_TTL seconds.
+# CACHE_ALIAS adds a tier shared by all workers; leave it None while the
+# default cache is the per-process LocMemCache, whose stale copies would
+# stretch that window to TTL.
+TOKEN_AUTH_CACHE = {
+  'MAX_SIZE': 10_000,
+  'LOCAL_TTL': 5,
+  'TTL': 60,
+  'CACHE_ALIAS': None,
+}
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -82,6 +82,12 @@ DATABASES = {
 }
 
 
+# Loads the user's relationship_app role together with the session user
+AUTHENTICATION_BACKENDS = [
+    'relationship_app.roles.RoleModelBackend',
+]
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -1,9 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 
-# Signals to create a user profile when a User is created
+# A user's library role. Rows are only created when a role is assigned
+# (relationship_app.roles.set_role); users without one are Members.
 class UserProfile(models.Model):
     ROLE_CHOICES = [
         ('Admin', 'Admin'),
@@ -16,11 +15,6 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.role}"
 
-@receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
-        UserProfile.objects.create(user=instance)
-        
 # Create your models here.
 class Author(models.Model):
     name = models.CharField(max_length=100)
@@ -41,6 +35,11 @@ class Book(models.Model):
             ("can_change_book", "Can change book"),
             ("can_delete_book", "Can delete book"),
         ]
+        indexes = [
+            # Catalogue pages sorted by title, overall and per author
+            models.Index(fields=["title", "id"], name="book_title_idx"),
+            models.Index(fields=["author", "title", "id"], name="book_author_title_idx"),
+        ]
 
 class Library(models.Model):
     name = models.CharField(max_length=100)
@@ -0,0 +1,87 @@
+"""
+Role resolution for the role-gated views.
+
+A user's role is read once per request and never costs a query of its
+own: RoleModelBackend loads the UserProfile together with the session
+user, and users loaded any other way fall back to a per-user cache entry
+that is dropped whenever their UserProfile changes. Users without a
+UserProfile row have the default role (Member), so creating a user needs
+no extra write.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.decorators import user_passes_test
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import UserProfile
+
+ROLE_CACHE_TIMEOUT = getattr(settings, 'ROLE_CACHE_TIMEOUT', 60 * 15)
+DEFAULT_ROLE = UserProfile._meta.get_field('role').default
+
+
+def role_cache_key(user_pk):
+    return f'relationship_app:role:{user_pk}'
+
+
+def get_role(user):
+    """
+    Return the role of `user`, or None for anonymous users.
+    """
+    if not user.is_authenticated:
+        return None
+    role = getattr(user, '_role', None)
+    if role is not None:
+        return role
+    if get_user_model().userprofile.is_cached(user):
+        try:
+            role = user.userprofile.role
+        except UserProfile.DoesNotExist:
+            role = DEFAULT_ROLE
+    else:
+        key = role_cache_key(user.pk)
+        role = cache.get(key)
+        if role is None:
+            role = UserProfile.objects.filter(user_id=user.pk).values_list('role', flat=True).first() or DEFAULT_ROLE
+            cache.set(key, role, ROLE_CACHE_TIMEOUT)
+    user._role = role
+    return role
+
+
+def set_role(user, role):
+    UserProfile.objects.update_or_create(user=user, defaults={'role': role})
+    user.__dict__.pop('_role', None)
+
+
+def role_required(*roles, login_url=None):
+    """
+    Decorator for views that only users with one of `roles` may see;
+    everyone else (anonymous users included) is sent to the login page.
+
+        @role_required('Admin', 'Librarian')
+        def view(request): ...
+    """
+    return user_passes_test(lambda user: get_role(user) in roles, login_url=login_url)
+
+
+class RoleModelBackend(ModelBackend):
+    """
+    ModelBackend that fetches the session user together with its
+    UserProfile, so role checks need no query of their own.
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related('userprofile').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_role(sender, instance, **kwargs):
+    cache.delete(role_cache_key(instance.user_id))
@@ -1,5 +1,8 @@
+from django.core.paginator import Paginator
+from django.db.models import Count, Prefetch, prefetch_related_objects
+from django.http import Http404
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import Book
+from .models import Author, Book
 from django.views.generic.detail import DetailView
 from .models import Library
 
@@ -8,8 +11,7 @@ from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 from django.urls import reverse_lazy
 from django.contrib.auth import login
-from django.contrib.auth.decorators import login_required, user_passes_test
-from .models import UserProfile
+from .roles import get_role, role_required
 
 from django.contrib.auth.decorators import permission_required
 from .models import Book
@@ -47,41 +49,95 @@ def delete_book(request, pk):
     return render(request, 'relationship_app/delete_book.html', {'book': book})
 
 def is_admin(user):
-    return hasattr(user, 'userprofile') and user.userprofile.role == 'Admin'
+    return get_role(user) == 'Admin'
 
 def is_librarian(user):
-    return hasattr(user, 'userprofile') and user.userprofile.role == 'Librarian'
+    return get_role(user) == 'Librarian'
 
 def is_member(user):
-    return hasattr(user, 'userprofile') and user.userprofile.role == 'Member'
+    return get_role(user) == 'Member'
 
-@login_required
-@user_passes_test(is_admin)
+@role_required('Admin')
 def admin_view(request):
     return render(request, 'relationship_app/admin_view.html')
 
-@login_required
-@user_passes_test(is_librarian)
+@role_required('Librarian')
 def librarian_view(request):
     return render(request, 'relationship_app/librarian_view.html')
 
-@login_required
-@user_passes_test(is_member)
+@role_required('Member')
 def member_view(request):
     return render(request, 'relationship_app/member_view.html')
 
+BOOKS_PER_PAGE = 50
+# ?sort= values; id last keeps the order stable between pages
+BOOK_ORDERINGS = {
+    'title': ('title', 'id'),
+    '-title': ('-title', '-id'),
+    'author': ('author__name', 'title', 'id'),
+    '-author': ('-author__name', '-title', '-id'),
+}
+
 # Create your views here.
 # Function based view
 def list_books(request):
-    books = Book.objects.all()
-    context = {'list_books': books}
+    """
+    Paginated catalogue. Authors come from the same query as the books
+    (select_related) and only the displayed columns are loaded, so a page
+    costs two queries (count + rows) however large the catalogue is.
+    Supports ?sort=title|-title|author|-author and ?author=<id>.
+    """
+    books = Book.objects.all().select_related('author').only('id', 'title', 'author__id', 'author__name')
+
+    author = None
+    author_id = request.GET.get('author')
+    if author_id:
+        if not author_id.isdigit():
+            raise Http404('Unknown author.')
+        author = get_object_or_404(Author.objects.only('id', 'name'), pk=author_id)
+        books = books.filter(author=author)
+
+    sort = request.GET.get('sort', 'title')
+    if sort not in BOOK_ORDERINGS:
+        sort = 'title'
+    books = books.order_by(*BOOK_ORDERINGS[sort])
+
+    page_obj = Paginator(books, BOOKS_PER_PAGE).get_page(request.GET.get('page'))
+    context = {'books': page_obj, 'page_obj': page_obj, 'sort': sort, 'author': author}
     return render(request, 'relationship_app/list_books.html', context)
 
 # Class based view
 class LibraryDetailView(DetailView):
+    """
+    A library and one page of its holdings. The holdings count is annotated
+    onto the library query and the page of books, with their authors
+    joined in, is a single sliced Prefetch: two queries in total whatever
+    the size of the library.
+    """
     model = Library
-    template_name = 'relationship_app/library_detail.html'
+    template_name = 'relationship_app/library_details.html'
     context_object_name = 'library'
+    paginate_by = 50
+
+    def get_queryset(self):
+        return Library.objects.annotate(holdings_count=Count('books'))
+
+    def get_context_data(self, **kwargs):
+        library = self.object
+        # Paginate positions only; the rows come from the prefetch below
+        page_obj = Paginator(range(library.holdings_count), self.paginate_by).get_page(self.request.GET.get('page'))
+        positions = page_obj.object_list
+        holdings = (
+            Book.objects.select_related('author')
+            .only('id', 'title', 'author__id', 'author__name')
+            .order_by('title', 'id')
+        )
+        prefetch_related_objects([library], Prefetch(
+            'books',
+            queryset=holdings[positions.start:positions.stop],
+            to_attr='holdings_page',
+        ))
+        return super().get_context_data(page_obj=page_obj, **kwargs)
 
 # Authentication
 class LoginView(LoginView):
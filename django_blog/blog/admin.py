@@ -1,7 +1,14 @@
 from django.contrib import admin
-from .models import Profile
+from .models import AvatarJob, Profile
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "bio")
     search_fields = ("user__username", "user__email")
+
+
+@admin.register(AvatarJob)
+class AvatarJobAdmin(admin.ModelAdmin):
+    list_display = ("profile", "status", "attempts", "created_at", "updated_at")
+    list_filter = ("status",)
+    readonly_fields = ("profile", "source", "attempts", "error", "created_at", "updated_at")
@@ -0,0 +1,126 @@
+"""
+Background processing of uploaded avatars.
+
+Each upload is recorded as an AvatarJob (a small database-backed queue)
+pointing at the staged original. With AVATAR_JOB_RUNNER = "thread" (the
+default) jobs are also started on the in-process thumbnail executor as
+soon as the request's transaction commits; `manage.py process_avatar_jobs`
+drains whatever is still pending, e.g. after a restart or when the runner
+is "db" and a separate worker process does all the work.
+
+A job decodes the original, applies and drops its EXIF orientation,
+downsizes it to AVATAR_MAX_DIMENSION, re-encodes it (which strips the
+remaining EXIF, GPS included), renders the thumbnails and only then swaps
+it in as the profile's avatar.
+"""
+import logging
+import posixpath
+import uuid
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import thumbnails
+from .models import AvatarJob, Profile
+from .uploads import avatar_storage
+
+logger = logging.getLogger(__name__)
+
+RUNNER = getattr(settings, "AVATAR_JOB_RUNNER", "thread")
+MAX_DIMENSION = getattr(settings, "AVATAR_MAX_DIMENSION", 1024)
+MAX_ATTEMPTS = 3
+
+
+def enqueue(profile, staged_name):
+    """
+    Queue the staged upload `staged_name` to become `profile`'s avatar.
+    """
+    job = AvatarJob.objects.create(profile=profile, source=staged_name)
+    if RUNNER == "thread":
+        transaction.on_commit(lambda: thumbnails.executor.submit(run_in_background, job.pk))
+    return job
+
+
+def run_in_background(job_pk):
+    try:
+        process_job(job_pk)
+    finally:
+        connection.close()
+
+
+def claim(job_pk):
+    # A conditional UPDATE, so two workers can never both take a job
+    return AvatarJob.objects.filter(pk=job_pk, status=AvatarJob.Status.PENDING).update(
+        status=AvatarJob.Status.RUNNING, attempts=F("attempts") + 1, updated_at=timezone.now(),
+    )
+
+
+def process_job(job_pk):
+    """
+    Run one pending job. Returns False if another worker already claimed it.
+    """
+    if not claim(job_pk):
+        return False
+    job = AvatarJob.objects.get(pk=job_pk)
+    storage = avatar_storage()
+    try:
+        with storage.open(job.source, "rb") as fh:
+            image = Image.open(fh)
+            image.load()
+        content = encode_avatar(image)
+        name = storage.save(posixpath.join("avatars", f"{uuid.uuid4().hex}.{thumbnails.FORMAT.lower()}"), content)
+        install_avatar(job.profile_id, name)
+    except Exception as exc:
+        logger.warning("Avatar job %s failed: %s", job_pk, exc)
+        job.status = AvatarJob.Status.FAILED
+        job.error = str(exc)
+    else:
+        job.status = AvatarJob.Status.DONE
+    storage.delete(job.source)
+    job.save(update_fields=["status", "error", "updated_at"])
+    return True
+
+
+def encode_avatar(image):
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((MAX_DIMENSION, MAX_DIMENSION), Image.Resampling.LANCZOS)
+    image = image.convert("RGBA" if thumbnails.FORMAT == "WEBP" and "A" in image.getbands() else "RGB")
+    buffer = BytesIO()
+    # No exif= argument: the saved file carries no EXIF at all
+    image.save(buffer, thumbnails.FORMAT, quality=85)
+    return ContentFile(buffer.getvalue())
+
+
+def install_avatar(profile_pk, name):
+    """
+    Render thumbnails for the processed avatar `name` and make it the
+    profile's avatar, removing the files it replaces.
+    """
+    profile = Profile.objects.only("pk", "avatar", "avatar_thumbnails").get(pk=profile_pk)
+    previous, previous_thumbnails = profile.avatar.name, profile.avatar_thumbnails
+    profile.avatar.name = name
+    names = thumbnails.render_thumbnails(profile.avatar)
+    # update() rather than save(): the Profile save signals would queue
+    # the thumbnails a second time
+    Profile.objects.filter(pk=profile_pk).update(avatar=name, avatar_thumbnails=names)
+    storage = profile.avatar.storage
+    if previous:
+        storage.delete(previous)
+    thumbnails.delete_thumbnails(storage, previous_thumbnails)
+
+
+def requeue_stale(older_than):
+    """
+    Put jobs left RUNNING by a worker that died back in the queue, unless
+    they have used up their attempts. Returns the number requeued.
+    """
+    return AvatarJob.objects.filter(
+        status=AvatarJob.Status.RUNNING,
+        updated_at__lt=timezone.now() - older_than,
+        attempts__lt=MAX_ATTEMPTS,
+    ).update(status=AvatarJob.Status.PENDING, updated_at=timezone.now())
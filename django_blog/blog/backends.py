@@ -0,0 +1,26 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .models import Profile
+
+
+class ProfileModelBackend(ModelBackend):
+    """
+    ModelBackend that loads the user's Profile in the same query as the
+    session user, so request.user.profile never costs a second query.
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related("profile").get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        if not self.user_can_authenticate(user):
+            return None
+        try:
+            user.profile
+        except Profile.DoesNotExist:
+            # Accounts older than the provisioning signal
+            user.profile, _ = Profile.objects.get_or_create(user=user)
+        return user
@@ -0,0 +1,171 @@
+"""
+Page caching and conditional GET for the public post pages.
+
+Anonymous GETs of the post list and detail pages are served whole from the
+cache, together with the ETag/Last-Modified validators they were rendered
+with, so a hit costs no database queries; ConditionalGetMiddleware turns a
+matching If-None-Match/If-Modified-Since into a 304.
+Authenticated users always get a fresh render because the pages show them
+per-user links, and so do anonymous visitors with flashed messages waiting,
+whose page would otherwise be served to everyone. On that path (and on
+cache misses) ConditionalGetMixin computes the validators from one
+aggregate query before rendering, so a revalidation still returns 304
+without loading any rows. Pages also show their author's username, which
+lives on another table and doesn't move updated_at: the detail validators
+read it from the current row, and list validators include the "list"
+generation, which an author rename bumps. Only the query parameters a view
+lists in page_cache_params are part of the cache key, so junk parameters
+can't multiply the entries.
+
+Invalidation is by generation: every cached page key embeds the current
+generation counters of what it shows ("list" for list pages, "post:<pk>"
+for a detail page). Post and Profile signals bump those counters, which
+orphans the old entries without having to know every cached URL.
+Use a cache shared by all workers (Redis, Memcached) in production;
+LocMemCache only invalidates the process that saw the change.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+
+CACHE_ALIAS = getattr(settings, "BLOG_PAGE_CACHE_ALIAS", "default")
+PAGE_TIMEOUT = getattr(settings, "BLOG_PAGE_CACHE_TIMEOUT", 60 * 10)
+
+LIST_GENERATION = "list"
+
+
+def post_generation(pk):
+    return f"post:{pk}"
+
+
+def _generation_key(name):
+    return f"blog:gen:{name}"
+
+
+def bump_generations(*names):
+    """
+    Invalidate every cached page that depends on any of `names`.
+    """
+    token = time.time_ns()
+    caches[CACHE_ALIAS].set_many({_generation_key(name): token for name in names}, None)
+
+
+def generation_state(generations):
+    """
+    The current counters of `generations` as one string; it changes
+    whenever any of them is bumped.
+    """
+    keys = [_generation_key(name) for name in generations]
+    current = caches[CACHE_ALIAS].get_many(keys)
+    return ":".join(str(current.get(key, 0)) for key in keys)
+
+
+def page_cache_key(request, generations, params=()):
+    """
+    Key for the page at request.path with the query parameters `params`
+    (any others are ignored), under the current `generations`.
+    """
+    state = generation_state(generations)
+    query = urlencode([(name, request.GET[name]) for name in sorted(params) if name in request.GET])
+    path = hashlib.md5(f"{request.path}?{query}".encode()).hexdigest()
+    return f"blog:page:{path}:{state}"
+
+
+def is_anonymous(request):
+    # Without a session cookie the user can only be anonymous; checking the
+    # cookie first avoids a session lookup on every cache hit
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return True
+    return not request.user.is_authenticated
+
+
+def has_pending_messages(request):
+    # len() loads the messages without marking them as shown
+    return len(get_messages(request)) > 0
+
+
+def make_etag(request, *parts):
+    if request.user.is_authenticated:
+        # Pages carry per-user links (edit/delete), so the user is part of it
+        parts = (f"user-{request.user.pk}", *parts)
+    return hashlib.md5(":".join(map(str, parts)).encode()).hexdigest()
+
+
+class ConditionalGetMixin:
+    """
+    Answer GET/HEAD with 304 Not Modified when the client's validators
+    still match, before the view loads or renders anything.
+    Views return (etag, last_modified) from get_validators(); returning
+    (None, None) skips the check (e.g. the object does not exist).
+    """
+
+    def get_validators(self):
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+
+        self.kwargs = kwargs
+        etag, last_modified = self.get_validators()
+        view = condition(
+            etag_func=lambda request, *args, **kwargs: etag,
+            last_modified_func=lambda request, *args, **kwargs: last_modified,
+        )(super().dispatch)
+        response = view(request, *args, **kwargs)
+        patch_vary_headers(response, ["Cookie"])
+        return response
+
+
+class AnonymousPageCacheMixin:
+    """
+    Serve anonymous GET/HEAD requests for the view from the page cache.
+    Views list the generations their page depends on in
+    page_cache_generations() and the query parameters that change the page
+    in page_cache_params.
+    """
+    page_cache_timeout = PAGE_TIMEOUT
+    page_cache_params = ()
+
+    def page_cache_generations(self):
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            request.method not in ("GET", "HEAD")
+            or not is_anonymous(request)
+            or has_pending_messages(request)
+        ):
+            return super().dispatch(request, *args, **kwargs)
+
+        self.kwargs = kwargs
+        cache = caches[CACHE_ALIAS]
+        key = page_cache_key(request, self.page_cache_generations(), self.page_cache_params)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        def store(rendered):
+            # Cookies are only set by middleware after this runs, so check
+            # what would put them there: messages added while rendering and
+            # a CSRF token rendered into the page, both per-visitor
+            if (
+                rendered.status_code == 200
+                and not rendered.cookies
+                and not has_pending_messages(request)
+                and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+            ):
+                cache.set(key, rendered, self.page_cache_timeout)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if hasattr(response, "add_post_render_callback"):
+            response.add_post_render_callback(store)
+        elif not getattr(response, "streaming", False):
+            store(response)
+        return response
@@ -0,0 +1,132 @@
+"""
+RSS 2.0, Atom and JSON Feed output for posts.
+
+Feeds are written as a stream of chunks from a values() query, so a large
+archive is never built in memory or turned into model instances. The view
+(blog.views.feed) keeps each rendered feed in the cache under its ETag, so
+polling readers get a 304 or the cached body instead of a new render.
+"""
+import hashlib
+import json
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.feedgenerator import rfc2822_date, rfc3339_date
+
+CACHE_ALIAS = getattr(settings, "BLOG_PAGE_CACHE_ALIAS", "default")
+FEED_ITEMS = getattr(settings, "BLOG_FEED_ITEMS", 50)
+FEED_CACHE_TIMEOUT = getattr(settings, "BLOG_FEED_CACHE_TIMEOUT", 60 * 60)
+ITEM_FIELDS = ("id", "title", "excerpt", "content_html", "published_at", "updated_at", "author__username")
+
+CONTENT_TYPES = {
+    "rss": "application/rss+xml; charset=utf-8",
+    "atom": "application/atom+xml; charset=utf-8",
+    "json": "application/feed+json; charset=utf-8",
+}
+
+
+def feed_etag(fmt, feed_url, last_modified, count, generations=""):
+    # feed_url is absolute: the body links to the host it was requested on,
+    # so a feed rendered for one host must never be served for another.
+    # `generations` (blog.caching.generation_state) covers author renames.
+    digest = hashlib.md5(f"{fmt}:{feed_url}:{last_modified}:{count}:{generations}".encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def get_cached(etag):
+    return caches[CACHE_ALIAS].get(f"blog:feed:{etag}")
+
+
+def caching(chunks, etag):
+    """
+    Pass chunks through and cache the whole body once the stream completes
+    (a client disconnecting midway leaves nothing behind).
+    """
+    body = []
+    for chunk in chunks:
+        body.append(chunk)
+        yield chunk
+    caches[CACHE_ALIAS].set(f"blog:feed:{etag}", "".join(body), FEED_CACHE_TIMEOUT)
+
+
+def rss_chunks(meta, items):
+    yield (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" '
+        'xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>'
+        f"<title>{escape(meta['title'])}</title>"
+        f"<link>{escape(meta['link'])}</link>"
+        f"<description>{escape(meta['title'])}</description>"
+        f'<atom:link href="{escape(meta["feed_url"])}" rel="self"></atom:link>'
+    )
+    if meta["updated"]:
+        yield f"<lastBuildDate>{rfc2822_date(meta['updated'])}</lastBuildDate>"
+    for item in items:
+        yield (
+            "<item>"
+            f"<title>{escape(item['title'])}</title>"
+            f"<link>{escape(item['url'])}</link>"
+            f"<description>{escape(item['content_html'])}</description>"
+            # RSS <author> must be an email address, which isn't public here
+            f"<dc:creator>{escape(item['author__username'])}</dc:creator>"
+            f"<pubDate>{rfc2822_date(item['published_at'])}</pubDate>"
+            f'<guid isPermaLink="true">{escape(item["url"])}</guid>'
+            "</item>"
+        )
+    yield "</channel></rss>"
+
+
+def atom_chunks(meta, items):
+    yield (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom">'
+        f"<title>{escape(meta['title'])}</title>"
+        f'<link href="{escape(meta["link"])}" rel="alternate"></link>'
+        f'<link href="{escape(meta["feed_url"])}" rel="self"></link>'
+        f"<id>{escape(meta['feed_url'])}</id>"
+    )
+    if meta["updated"]:
+        yield f"<updated>{rfc3339_date(meta['updated'])}</updated>"
+    for item in items:
+        yield (
+            "<entry>"
+            f"<title>{escape(item['title'])}</title>"
+            f'<link href="{escape(item["url"])}" rel="alternate"></link>'
+            f"<id>{escape(item['url'])}</id>"
+            f"<published>{rfc3339_date(item['published_at'])}</published>"
+            f"<updated>{rfc3339_date(item['updated_at'])}</updated>"
+            f"<author><name>{escape(item['author__username'])}</name></author>"
+            f"<summary>{escape(item['excerpt'])}</summary>"
+            f'<content type="html">{escape(item["content_html"])}</content>'
+            "</entry>"
+        )
+    yield "</feed>"
+
+
+def json_chunks(meta, items):
+    header = json.dumps({
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": meta["title"],
+        "home_page_url": meta["link"],
+        "feed_url": meta["feed_url"],
+    })
+    # Reopen the header object to stream the items array into it
+    yield header[:-1] + ', "items": ['
+    separator = ""
+    for item in items:
+        yield separator + json.dumps({
+            "id": item["url"],
+            "url": item["url"],
+            "title": item["title"],
+            "content_html": item["content_html"],
+            "summary": item["excerpt"],
+            "date_published": item["published_at"].isoformat(),
+            "date_modified": item["updated_at"].isoformat(),
+            "authors": [{"name": item["author__username"]}],
+        })
+        separator = ","
+    yield "]}"
+
+
+GENERATORS = {"rss": rss_chunks, "atom": atom_chunks, "json": json_chunks}
@@ -1,7 +1,10 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.utils import timezone
+from . import avatars
 from .models import Profile, Post
+from .uploads import MAX_UPLOAD_SIZE, HEADER_SIZE, StagedAvatarFile, avatar_storage, looks_like_image, staging_name
 
 class RegistrationForm(UserCreationForm):
     """
@@ -34,12 +37,81 @@ class UserUpdateForm(forms.ModelForm):
 class ProfileUpdateForm(forms.ModelForm):
     """
     Edit extended profile fields.
+    A new avatar is only checked cheaply here (size, file signature) and
+    queued; blog.avatars decodes and installs it in the background.
     """
+    avatar = forms.FileField(required=False)
+
     class Meta:
         model = Profile
-        fields = ("bio", "avatar")
+        fields = ("bio",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["avatar"].initial = self.instance.avatar
+
+    def clean_avatar(self):
+        avatar = self.cleaned_data["avatar"]
+        if not avatar:
+            return avatar
+        if isinstance(avatar, StagedAvatarFile):
+            header = avatar.header
+        else:
+            header = avatar.read(HEADER_SIZE)
+            avatar.seek(0)
+        if avatar.size > MAX_UPLOAD_SIZE:
+            self.discard_upload()
+            raise forms.ValidationError(f"Avatars can be at most {MAX_UPLOAD_SIZE // (1024 * 1024)} MB.")
+        if not looks_like_image(header):
+            self.discard_upload()
+            raise forms.ValidationError("Upload a JPEG, PNG, GIF or WebP image.")
+        return avatar
+
+    def discard_upload(self):
+        """
+        Delete a streamed upload that won't be used (invalid form).
+        """
+        avatar = self.files.get("avatar")
+        if isinstance(avatar, StagedAvatarFile):
+            avatar.discard()
+
+    def save(self, commit=True):
+        avatar = self.cleaned_data.get("avatar")
+        if avatar is False:
+            # "Clear" ticked; the Profile pre_save receiver drops thumbnails
+            self.instance.avatar = None
+        profile = super().save(commit)
+        if avatar and commit:
+            if isinstance(avatar, StagedAvatarFile):
+                avatar.claim()
+                staged = avatar.staged_name
+            else:
+                staged = avatar_storage().save(staging_name(avatar.name), avatar)
+            avatars.enqueue(profile, staged)
+        return profile
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
-        fields = ['title', 'content']
\ No newline at end of file
+        fields = ['title', 'content', 'status', 'published_at']
+        widgets = {
+            'published_at': forms.DateTimeInput(attrs={'type': 'datetime-local'}, format='%Y-%m-%dT%H:%M'),
+        }
+        help_texts = {
+            'published_at': 'For scheduled posts: when the post goes live.',
+        }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        status = cleaned_data.get('status')
+        published_at = cleaned_data.get('published_at')
+        if status == Post.Status.SCHEDULED:
+            if published_at is None:
+                self.add_error('published_at', 'Scheduled posts need a publish time.')
+            elif published_at <= timezone.now():
+                self.add_error('published_at', 'Pick a time in the future, or publish now.')
+        elif status == Post.Status.PUBLISHED and published_at and published_at > timezone.now():
+            self.add_error('status', 'Use "Scheduled" to publish at a future time.')
+        elif status == Post.Status.DRAFT:
+            cleaned_data['published_at'] = None
+        return cleaned_data
\ No newline at end of file
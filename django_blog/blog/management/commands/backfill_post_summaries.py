@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Fill Post.excerpt, word_count, reading_time and content_html for existing posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        batch, total = [], 0
+        # iterator() keeps memory flat; only the columns used are read
+        posts = Post.objects.only("id", "content", "content_hash")
+        for post in posts.iterator(chunk_size=batch_size):
+            post.refresh_summary()
+            post.refresh_rendered()
+            batch.append(post)
+            if len(batch) >= batch_size:
+                total += self.flush(batch)
+        total += self.flush(batch)
+        self.stdout.write(self.style.SUCCESS(f"Updated {total} posts."))
+
+    def flush(self, batch):
+        # bulk_update leaves updated_at alone: a backfill isn't an edit
+        Post.objects.bulk_update(
+            batch, ["excerpt", "word_count", "reading_time", "content_html", "content_hash"],
+        )
+        count = len(batch)
+        batch.clear()
+        return count
@@ -0,0 +1,52 @@
+import csv
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+FIELDS = ["title", "content", "author", "status", "created_at", "published_at", "updated_at"]
+
+
+class Command(BaseCommand):
+    help = "Export all posts as NDJSON or CSV (the format import_posts reads)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+        parser.add_argument("--output", "-o", help="File to write; stdout by default.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        output = open(options["output"], "w", newline="", encoding="utf-8") if options["output"] else sys.stdout
+        # values() + iterator(): plain dicts streamed from a server-side cursor,
+        # so memory stays constant whatever the archive size
+        rows = (
+            Post.objects.order_by("id")
+            .values("title", "content", "author__username", "status", "created_at", "published_at", "updated_at")
+            .iterator(chunk_size=options["chunk_size"])
+        )
+        writer = csv.DictWriter(output, FIELDS) if options["format"] == "csv" else None
+        if writer:
+            writer.writeheader()
+        count = 0
+        try:
+            for row in rows:
+                record = {
+                    "title": row["title"],
+                    "content": row["content"],
+                    "author": row["author__username"],
+                    "status": row["status"],
+                    "created_at": row["created_at"].isoformat(),
+                    "published_at": row["published_at"] and row["published_at"].isoformat(),
+                    "updated_at": row["updated_at"].isoformat(),
+                }
+                if writer:
+                    writer.writerow(record)
+                else:
+                    output.write(json.dumps(record) + "\n")
+                count += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        self.stderr.write(self.style.SUCCESS(f"Exported {count} posts."))
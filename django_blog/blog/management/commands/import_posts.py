@@ -0,0 +1,135 @@
+import csv
+import json
+import sys
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog import search
+from blog.caching import LIST_GENERATION, bump_generations
+from blog.models import Post
+
+REQUIRED_FIELDS = ("title", "content", "author")
+TITLE_MAX_LENGTH = Post._meta.get_field("title").max_length
+
+
+class Command(BaseCommand):
+    help = (
+        "Import posts from NDJSON or CSV with title, content, author (username) "
+        "and optionally created_at, status and published_at. Use - to read stdin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["ndjson", "csv"])
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or ("csv" if options["path"].endswith(".csv") else "ndjson")
+        batch_size = options["batch_size"]
+        source = sys.stdin if options["path"] == "-" else open(options["path"], newline="", encoding="utf-8")
+        imported = skipped = 0
+        try:
+            rows = self.read_csv(source) if fmt == "csv" else self.read_ndjson(source)
+            # Numbered for the error messages
+            rows = enumerate(rows, 1)
+            # islice pulls one batch at a time, so memory stays flat
+            while batch := list(islice(rows, batch_size)):
+                created, missing = self.import_batch(batch)
+                imported += created
+                skipped += missing
+                self.stdout.write(f"Imported {imported} posts...", ending="\r")
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        # Rows written by bulk_create skip the signals that invalidate pages
+        bump_generations(LIST_GENERATION)
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported} posts, skipped {skipped}."))
+
+    def read_ndjson(self, source):
+        for number, line in enumerate(source, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as exc:
+                    raise CommandError(f"Line {number}: {exc}")
+
+    def read_csv(self, source):
+        # Post bodies easily exceed the csv module's 128 KB field limit
+        csv.field_size_limit(sys.maxsize)
+        yield from csv.DictReader(source)
+
+    def import_batch(self, rows):
+        """
+        Import a batch of (record number, row) pairs. Rows that fail
+        validation are reported on stderr and skipped.
+        """
+        valid = []
+        for number, row in rows:
+            try:
+                valid.append(self.clean_row(row))
+            except ValueError as exc:
+                self.stderr.write(f"Record {number}: {exc}; skipping.")
+        # One query resolves every author in the batch
+        usernames = {row["author"] for row in valid}
+        authors = dict(User.objects.filter(username__in=usernames).values_list("username", "pk"))
+        posts = []
+        for row in valid:
+            if row["author"] not in authors:
+                self.stderr.write(f"Unknown author {row['author']!r}; skipping {row['title']!r}.")
+                continue
+            post = Post(title=row["title"], content=row["content"], author_id=authors[row["author"]])
+            if row["created_at"]:
+                post.created_at = row["created_at"]
+            post.status = row["status"]
+            if row["published_at"]:
+                post.published_at = row["published_at"]
+            elif post.status == Post.Status.PUBLISHED:
+                post.published_at = post.created_at
+            # bulk_create doesn't call save(), which derives these
+            post.refresh_summary()
+            post.refresh_rendered()
+            posts.append(post)
+        with transaction.atomic():
+            Post.objects.bulk_create(posts)
+            search.index_posts(post.pk for post in posts)
+        return len(posts), len(rows) - len(posts)
+
+    def clean_row(self, row):
+        """
+        Check a row before it reaches bulk_create, where a bad value would
+        abort the whole batch. Returns the row with its dates parsed and
+        status defaulted; raises ValueError describing the first problem.
+        """
+        if not isinstance(row, dict):
+            raise ValueError("expected an object")
+        for field in REQUIRED_FIELDS:
+            if not isinstance(row.get(field), str) or not row[field].strip():
+                raise ValueError(f"missing {field}")
+        if len(row["title"]) > TITLE_MAX_LENGTH:
+            raise ValueError(f"title longer than {TITLE_MAX_LENGTH} characters")
+        status = row.get("status") or Post.Status.PUBLISHED
+        if status not in Post.Status.values:
+            raise ValueError(f"invalid status {status!r}")
+        cleaned = {**row, "status": status}
+        for field in ("created_at", "published_at"):
+            cleaned[field] = self.parse_date(row, field)
+        return cleaned
+
+    def parse_date(self, row, field):
+        value = row.get(field)
+        if not value:
+            return None
+        try:
+            parsed = parse_datetime(value)
+        except (TypeError, ValueError):
+            parsed = None
+        if parsed is None:
+            raise ValueError(f"invalid {field} {value!r}")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
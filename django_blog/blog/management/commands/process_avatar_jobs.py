@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from blog import avatars
+from blog.models import AvatarJob
+
+
+class Command(BaseCommand):
+    help = "Process pending avatar uploads (see blog.avatars)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-minutes", type=int, default=15,
+            help="Requeue jobs that have been running longer than this.",
+        )
+
+    def handle(self, *args, **options):
+        requeued = avatars.requeue_stale(timedelta(minutes=options["stale_minutes"]))
+        pending = AvatarJob.objects.filter(status=AvatarJob.Status.PENDING).order_by("created_at")
+        processed = sum(avatars.process_job(pk) for pk in pending.values_list("pk", flat=True))
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} avatar jobs ({requeued} requeued)."))
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog import search
+from blog.caching import LIST_GENERATION, bump_generations, post_generation
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Publish scheduled posts whose published_at has passed. Run it from cron, or with --interval."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--interval", type=int, default=0,
+            help="Keep running, checking every this many seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            published = self.publish_due(options["batch_size"])
+            if published or options["verbosity"] > 1:
+                self.stdout.write(self.style.SUCCESS(f"Published {published} scheduled posts."))
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
+
+    def publish_due(self, batch_size):
+        total = 0
+        while True:
+            now = timezone.now()
+            with transaction.atomic():
+                # Reads the post_scheduled_idx partial index, due posts only
+                due = Post.objects.filter(status=Post.Status.SCHEDULED, published_at__lte=now)
+                pks = list(due.order_by("published_at").values_list("pk", flat=True)[:batch_size])
+                if not pks:
+                    break
+                # Re-checking the status makes a concurrent run (or an author
+                # unscheduling the post meanwhile) harmless
+                Post.objects.filter(pk__in=pks, status=Post.Status.SCHEDULED).update(
+                    status=Post.Status.PUBLISHED, updated_at=now,
+                )
+                search.index_posts(pks)
+            # update() skips the save signals that invalidate cached pages
+            bump_generations(LIST_GENERATION, *(post_generation(pk) for pk in pks))
+            total += len(pks)
+        return total
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:21
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX post_search_vector_gin ON blog_post USING gin (search_vector)"
+        )
+        schema_editor.execute(
+            "UPDATE blog_post SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(content, '')), 'B')"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute("CREATE VIRTUAL TABLE blog_post_fts USING fts5(title, content)")
+        schema_editor.execute(
+            "INSERT INTO blog_post_fts (rowid, title, content) SELECT id, title, content FROM blog_post"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS post_search_vector_gin")
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS blog_post_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_summary_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
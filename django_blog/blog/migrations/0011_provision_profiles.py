@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:31
+
+from django.conf import settings
+from django.db import migrations
+
+
+def provision_profiles(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Profile = apps.get_model("blog", "Profile")
+    missing = User.objects.filter(profile__isnull=True).values_list("pk", flat=True)
+    Profile.objects.bulk_create(
+        (Profile(user_id=pk) for pk in missing.iterator()), batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_author_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(provision_profiles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_provision_profiles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvatarJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='avatar_jobs', to='blog.profile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='avatarjob_status_idx')],
+            },
+        ),
+    ]
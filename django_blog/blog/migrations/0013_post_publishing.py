@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:30
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_published_at(apps, schema_editor):
+    # Every existing post is live; it went live when it was created
+    Post = apps.get_model("blog", "Post")
+    Post.objects.filter(published_at__isnull=True).update(published_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_avatarjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_created_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_updated_at_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_author_created_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='published_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('scheduled', 'Scheduled'), ('published', 'Published')], default='published', max_length=10),
+        ),
+        migrations.RunPython(backfill_published_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-published_at', '-id'], name='post_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['author', '-published_at', '-id'], name='post_author_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['updated_at'], name='post_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('status', 'scheduled')), fields=['published_at'], name='post_scheduled_idx'),
+        ),
+    ]
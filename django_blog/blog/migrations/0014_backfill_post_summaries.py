@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:02
+
+from django.db import migrations
+from django.utils.text import Truncator
+
+# Frozen copies of blog.models.EXCERPT_WORDS / WORDS_PER_MINUTE
+EXCERPT_WORDS = 20
+WORDS_PER_MINUTE = 200
+
+
+def backfill_summaries(apps, schema_editor):
+    # Same derivation as Post.refresh_summary(), for posts written before
+    # the summary columns existed
+    Post = apps.get_model("blog", "Post")
+    batch = []
+    for post in Post.objects.filter(word_count=0).only("id", "content").iterator(chunk_size=1000):
+        post.word_count = len(post.content.split())
+        post.reading_time = max(1, -(-post.word_count // WORDS_PER_MINUTE))
+        post.excerpt = Truncator(post.content).words(EXCERPT_WORDS)
+        batch.append(post)
+        if len(batch) >= 1000:
+            Post.objects.bulk_update(batch, ["excerpt", "word_count", "reading_time"])
+            batch.clear()
+    Post.objects.bulk_update(batch, ["excerpt", "word_count", "reading_time"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_publishing'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:04
+
+from django.db import migrations
+
+
+def backfill_content_html(apps, schema_editor):
+    # Render posts written before content_html existed with the renderer
+    # Post.refresh_rendered() uses
+    from blog import rendering
+
+    Post = apps.get_model("blog", "Post")
+    batch = []
+    for post in Post.objects.filter(content_hash="").only("id", "content").iterator(chunk_size=1000):
+        post.content_html = rendering.render_content(post.content)
+        post.content_hash = rendering.content_hash(post.content)
+        batch.append(post)
+        if len(batch) >= 1000:
+            Post.objects.bulk_update(batch, ["content_html", "content_hash"])
+            batch.clear()
+    Post.objects.bulk_update(batch, ["content_html", "content_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_backfill_post_summaries'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_content_html, migrations.RunPython.noop),
+    ]
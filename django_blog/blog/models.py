@@ -1,21 +1,121 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 # from django.conf import settings
 from django.contrib.auth.models import User
 from django.utils import timezone
-  
+from django.utils.text import Truncator
+
+from . import rendering, search
+
+EXCERPT_WORDS = 20
+WORDS_PER_MINUTE = 200
+
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        """
+        Publicly visible posts. Listings filter on exactly this, which
+        is what lets them use the partial indexes on published rows.
+        """
+        return self.filter(status=Post.Status.PUBLISHED)
+
 class Post(models.Model):
+    class Status(models.TextChoices):
+        DRAFT = "draft"
+        SCHEDULED = "scheduled"
+        PUBLISHED = "published"
+
     title = models.CharField(max_length=200)
     content = models.TextField()
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="posts")
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PUBLISHED)
+    # When a scheduled post goes live (see publish_scheduled); set on publish
+    published_at = models.DateTimeField(null=True, blank=True)
+    # Derived from content on save so list pages never load the full body
+    excerpt = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=1, editable=False)  # minutes
+    # Sanitized HTML rendered from content on save; see blog.rendering
+    content_html = models.TextField(blank=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    # PostgreSQL full-text index (GIN); maintained by blog.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']  # newest first
+        indexes = [
+            # Partial indexes over published rows only: drafts and the
+            # publish queue never bloat what the listings scan.
+            # The post list's (published_at, id) keyset pagination
+            models.Index(
+                fields=['-published_at', '-id'], name='post_published_idx',
+                condition=models.Q(status='published'),
+            ),
+            # An author's posts newest first: archive pages and the
+            # latest-posts prefetch on the author index
+            models.Index(
+                fields=['author', '-published_at', '-id'], name='post_author_published_idx',
+                condition=models.Q(status='published'),
+            ),
+            # MAX(updated_at) for the list page's conditional GET validators
+            models.Index(
+                fields=['updated_at'], name='post_updated_at_idx',
+                condition=models.Q(status='published'),
+            ),
+            # The publish queue: scheduled posts by due time
+            models.Index(
+                fields=['published_at'], name='post_scheduled_idx',
+                condition=models.Q(status='scheduled'),
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if self.status == self.Status.PUBLISHED and self.published_at is None:
+            self.published_at = timezone.now()
+            if update_fields is not None:
+                update_fields = kwargs["update_fields"] = {*update_fields, "published_at"}
+        if update_fields is None or "content" in update_fields:
+            self.refresh_summary()
+            self.refresh_rendered()
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields, "excerpt", "word_count", "reading_time", "content_html", "content_hash",
+                }
+        super().save(*args, **kwargs)
+        if update_fields is None or {"title", "content", "status"} & set(update_fields):
+            search.index_posts([self.pk])
+
+    @property
+    def is_published(self):
+        return self.status == self.Status.PUBLISHED
+
+    def refresh_summary(self):
+        """
+        Recompute excerpt, word count and reading time from content.
+        Call it yourself before bulk_create/bulk_update, which skip save().
+        """
+        self.word_count = len(self.content.split())
+        self.reading_time = max(1, -(-self.word_count // WORDS_PER_MINUTE))
+        self.excerpt = Truncator(self.content).words(EXCERPT_WORDS)
+
+    def refresh_rendered(self):
+        """
+        Re-render content_html if content (or the renderer) changed since
+        it was last rendered. Like refresh_summary(), bulk writes must call
+        it themselves.
+        """
+        digest = rendering.content_hash(self.content)
+        if digest != self.content_hash:
+            self.content_html = rendering.render_content(self.content)
+            self.content_hash = digest
+
 class Profile(models.Model):
     """
     Extends Django's User with optional fields for the blog.
@@ -23,6 +123,43 @@ class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
     bio = models.TextField(blank=True)
     avatar = models.ImageField(upload_to="avatars/", blank=True, null=True)
+    # {"48": <storage name>, "128": ..., "512": ...}; see blog.thumbnails
+    avatar_thumbnails = models.JSONField(default=dict, blank=True, editable=False)
+
+    def __str__(self):
+        return f"Profile({self.user.username})"
+
+    @property
+    def avatar_urls(self):
+        """
+        URLs of the rendered avatar variants keyed by size, e.g.
+        {{ profile.avatar_urls.128 }} in templates.
+        """
+        storage = self.avatar.storage
+        return {size: storage.url(name) for size, name in self.avatar_thumbnails.items()}
+
+class AvatarJob(models.Model):
+    """
+    A queued avatar upload waiting to be processed; see blog.avatars.
+    """
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="avatar_jobs")
+    source = models.CharField(max_length=255)  # storage name of the staged upload
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='avatarjob_status_idx'),
+        ]
 
     def __str__(self):
-        return f"Profile({self.user.username})"
\ No newline at end of file
+        return f"AvatarJob({self.profile_id}, {self.status})"
@@ -0,0 +1,92 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+
+
+class KeysetPage:
+    """
+    Stands in for Django's Page in templates: iterate it for the rows and use
+    next_cursor / previous_cursor to build the "older" / "newer" links.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def encode_cursor(obj, field="created_at"):
+    raw = f"{getattr(obj, field).isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        value, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        value = parse_datetime(value)
+        pk = int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        value = None
+    if value is None:
+        raise Http404("Invalid page cursor.")
+    return value, pk
+
+
+class KeysetPaginationMixin:
+    """
+    Keyset ("seek") pagination for ListViews ordered newest first on
+    (cursor_field, id). A page is a range scan that starts right after the
+    cursor, so page 1,000 costs the same as page 1 (unlike OFFSET).
+    ?before=<cursor> pages to older rows, ?after=<cursor> to newer ones.
+    """
+    paginate_by = 10
+    cursor_field = "created_at"
+
+    def paginate_queryset(self, queryset, page_size):
+        field = self.cursor_field
+        before = self.request.GET.get("before")
+        after = self.request.GET.get("after")
+
+        if after:
+            value, pk = decode_cursor(after)
+            newer = Q(**{f"{field}__gt": value}) | Q(**{field: value, "pk__gt": pk})
+            rows = list(queryset.filter(newer).order_by(field, "pk")[:page_size + 1])
+            has_more = len(rows) > page_size
+            rows = rows[:page_size][::-1]
+            page = KeysetPage(
+                rows,
+                next_cursor=encode_cursor(rows[-1], field) if rows else None,
+                previous_cursor=encode_cursor(rows[0], field) if rows and has_more else None,
+            )
+        else:
+            if before:
+                value, pk = decode_cursor(before)
+                older = Q(**{f"{field}__lt": value}) | Q(**{field: value, "pk__lt": pk})
+                queryset = queryset.filter(older)
+            rows = list(queryset.order_by(f"-{field}", "-pk")[:page_size + 1])
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+            page = KeysetPage(
+                rows,
+                next_cursor=encode_cursor(rows[-1], field) if has_more else None,
+                previous_cursor=encode_cursor(rows[0], field) if before and rows else None,
+            )
+        return None, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,38 @@
+"""
+Post content rendering.
+
+Post.content is turned into HTML once, on save, and stored in
+Post.content_html so views only ever emit the precomputed markup.
+With the optional `markdown` and `nh3` packages installed content is
+rendered as Markdown and sanitized; otherwise it is escaped and split into
+paragraphs (Django's linebreaks filter). The renderer name is part of
+content_hash, so after installing them `manage.py backfill_post_summaries`
+re-renders only the posts that are stale.
+"""
+import hashlib
+
+from django.utils.html import linebreaks
+
+try:
+    import markdown
+    import nh3
+except ImportError:  # pragma: no cover - optional dependencies
+    markdown = nh3 = None
+
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists"]
+
+RENDERER = "markdown-1" if markdown else "linebreaks-1"
+
+
+def content_hash(content):
+    return hashlib.sha256(f"{RENDERER}\n{content}".encode()).hexdigest()
+
+
+def render_content(content):
+    """
+    Return sanitized HTML for raw post content.
+    """
+    if markdown is None:
+        return linebreaks(content, autoescape=True)
+    # Markdown passes raw HTML through, so the output is always cleaned
+    return nh3.clean(markdown.markdown(content, extensions=MARKDOWN_EXTENSIONS))
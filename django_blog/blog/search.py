@@ -0,0 +1,142 @@
+"""
+Full-text search over posts.
+
+On PostgreSQL, Post.search_vector holds a weighted tsvector (title A,
+content B) behind a GIN index and results are ranked with ts_rank and
+highlighted with ts_headline. On SQLite (local development and tests) the
+same API is served by an FTS5 table, blog_post_fts, ranked with bm25().
+Both indexes are refreshed from Post.save() and cleared on delete; call
+index_posts() after bulk writes that skip save(). Other databases fall
+back to unranked icontains matching, newest first. Only published posts
+are searchable.
+"""
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+SEARCH_CONFIG = "english"
+# Never valid in post text, so they survive escaping and become <mark> tags
+START_SEL, STOP_SEL = "\x02", "\x03"
+
+
+def post_vector():
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("content", weight="B", config=SEARCH_CONFIG)
+    )
+
+
+def index_posts(pks):
+    """
+    Refresh the search index for the posts with the given primary keys.
+    """
+    from .models import Post
+
+    pks = list(pks)
+    if not pks:
+        return
+    if connection.vendor == "postgresql":
+        Post.objects.filter(pk__in=pks).update(search_vector=post_vector())
+    elif connection.vendor == "sqlite":
+        placeholders = ", ".join(["%s"] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM blog_post_fts WHERE rowid IN ({placeholders})", pks)
+            cursor.execute(
+                "INSERT INTO blog_post_fts (rowid, title, content) "
+                f"SELECT id, title, content FROM blog_post WHERE id IN ({placeholders}) AND status = %s",
+                [*pks, Post.Status.PUBLISHED],
+            )
+
+
+def unindex_post(pk):
+    # The PostgreSQL vector lives on the row itself and goes with it
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM blog_post_fts WHERE rowid = %s", [pk])
+
+
+def highlight(text):
+    return mark_safe(escape(text).replace(START_SEL, "<mark>").replace(STOP_SEL, "</mark>"))
+
+
+def search_posts(query, offset=0, limit=10):
+    """
+    Return up to `limit` posts matching `query`, best match first, each with
+    a `headline` attribute holding a highlighted, HTML-safe snippet.
+    """
+    from .models import Post
+
+    query = query.strip()
+    if not query:
+        return []
+    if connection.vendor == "postgresql":
+        return _search_postgresql(Post, query, offset, limit)
+    if connection.vendor == "sqlite":
+        return _search_sqlite(Post, query, offset, limit)
+    return _search_icontains(Post, query, offset, limit)
+
+
+def _search_postgresql(Post, query, offset, limit):
+    search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+    posts = (
+        Post.objects.published()
+        .filter(search_vector=search_query)
+        .annotate(
+            rank=SearchRank(F("search_vector"), search_query),
+            raw_headline=SearchHeadline(
+                "content", search_query, config=SEARCH_CONFIG,
+                start_sel=START_SEL, stop_sel=STOP_SEL, max_words=35, min_words=15,
+            ),
+        )
+        .select_related("author")
+        .only("id", "title", "published_at", "author__id", "author__username")
+        .order_by("-rank", "-id")[offset:offset + limit]
+    )
+    posts = list(posts)
+    for post in posts:
+        post.headline = highlight(post.raw_headline)
+    return posts
+
+
+def _search_sqlite(Post, query, offset, limit):
+    # Quote every term so user input can't inject FTS5 query syntax
+    match = " ".join('"%s"' % term.replace('"', '""') for term in query.split())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT rowid, snippet(blog_post_fts, 1, %s, %s, '…', 35) "
+            "FROM blog_post_fts WHERE blog_post_fts MATCH %s "
+            "ORDER BY bm25(blog_post_fts, 2.0, 1.0), rowid DESC LIMIT %s OFFSET %s",
+            [START_SEL, STOP_SEL, match, limit, offset],
+        )
+        rows = cursor.fetchall()
+    posts = (
+        Post.objects
+        .select_related("author")
+        .only("id", "title", "published_at", "author__id", "author__username")
+        .in_bulk([pk for pk, _ in rows])
+    )
+    results = []
+    for pk, snippet in rows:
+        if pk in posts:
+            posts[pk].headline = highlight(snippet)
+            results.append(posts[pk])
+    return results
+
+
+def _search_icontains(Post, query, offset, limit):
+    # No full-text index: every term must appear in the title or content
+    condition = Q()
+    for term in query.split():
+        condition &= Q(title__icontains=term) | Q(content__icontains=term)
+    posts = list(
+        Post.objects.published()
+        .filter(condition)
+        .select_related("author")
+        .only("id", "title", "excerpt", "published_at", "author__id", "author__username")
+        .order_by("-published_at", "-id")[offset:offset + limit]
+    )
+    for post in posts:
+        post.headline = escape(post.excerpt)
+    return posts
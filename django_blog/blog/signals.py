@@ -1,13 +1,54 @@
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from .models import Profile
+from . import search, thumbnails
+from .caching import LIST_GENERATION, bump_generations, post_generation
+from .models import Post, Profile
 
 @receiver(post_save, sender=User)
-def create_or_update_user_profile(sender, instance, created, **kwargs):
+def create_user_profile(sender, instance, created, **kwargs):
+    # Only on creation: saving the profile on every user save (each login
+    # updates last_login) cost queries and re-ran the Profile receivers
     if created:
-        Profile.objects.create(user=instance)
-    else:
-        # Ensure profile exists (e.g., if created before signals were wired)
         Profile.objects.get_or_create(user=instance)
-        instance.profile.save()
+
+@receiver(pre_save, sender=Profile)
+def mark_new_avatar(sender, instance, **kwargs):
+    avatar = instance.avatar
+    # An uncommitted FieldFile is a fresh upload that save() is about to store
+    instance._thumbnails_pending = bool(avatar) and not avatar._committed
+    if not avatar and instance.avatar_thumbnails:
+        thumbnails.delete_thumbnails(avatar.storage, instance.avatar_thumbnails)
+        instance.avatar_thumbnails = {}
+
+@receiver(post_save, sender=Profile)
+def queue_avatar_thumbnails(sender, instance, **kwargs):
+    if getattr(instance, "_thumbnails_pending", False):
+        instance._thumbnails_pending = False
+        transaction.on_commit(lambda: thumbnails.executor.submit(thumbnails.build_avatar_thumbnails, instance.pk))
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    bump_generations(LIST_GENERATION, post_generation(instance.pk))
+
+def bump_author_generations(user_id):
+    # Author details are rendered on the list and on each of their posts
+    post_ids = Post.objects.filter(author_id=user_id).values_list("pk", flat=True)
+    bump_generations(LIST_GENERATION, *(post_generation(pk) for pk in post_ids))
+
+@receiver(post_save, sender=Profile)
+def invalidate_author_pages(sender, instance, **kwargs):
+    bump_author_generations(instance.user_id)
+
+@receiver(post_save, sender=User)
+def invalidate_renamed_author_pages(sender, instance, created, update_fields=None, **kwargs):
+    # Skips partial saves that can't rename, like login's last_login update
+    if created or (update_fields is not None and "username" not in update_fields):
+        return
+    bump_author_generations(instance.pk)
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_search(sender, instance, **kwargs):
+    search.unindex_post(instance.pk)
@@ -1,3 +1,632 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+from django.contrib import messages
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.messages.storage import default_storage
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import avatars, thumbnails
+from .forms import PostForm
+from .models import AvatarJob, Post, Profile
+from .pagination import encode_cursor
+from .rendering import content_hash
+from .search import search_posts
+from .views import PostListView
+from .uploads import STAGING_DIR, avatar_storage
+
+
+def image_file(name="avatar.png", size=(40, 30), fmt="PNG"):
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, fmt)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f"image/{fmt.lower()}")
+
+
+class AvatarUploadTests(TestCase):
+    """
+    Avatars are streamed into avatars/incoming, queued as an AvatarJob and
+    processed later; a staged file that isn't queued must not outlive its
+    request.
+    """
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user("alice", "alice@example.com", "pw")
+        self.client.force_login(self.user)
+
+    def staged(self):
+        storage = avatar_storage()
+        if not storage.exists(STAGING_DIR):
+            return []
+        return storage.listdir(STAGING_DIR)[1]
+
+    def post(self, client=None, **extra):
+        data = {"email": "alice@example.com", "bio": "hi", "avatar": image_file(), **extra}
+        return (client or self.client).post(reverse("profile"), data)
+
+    def test_upload_queues_job_and_processing_installs_avatar(self):
+        response = self.post()
+        self.assertRedirects(response, reverse("profile"))
+        job = AvatarJob.objects.get()
+        self.assertTrue(job.source.startswith(STAGING_DIR))
+        self.assertEqual(self.staged(), [job.source.rsplit("/", 1)[1]])
+
+        self.assertTrue(avatars.process_job(job.pk))
+        job.refresh_from_db()
+        self.assertEqual(job.status, AvatarJob.Status.DONE)
+        self.assertEqual(self.staged(), [])
+        profile = self.user.profile
+        profile.refresh_from_db()
+        self.assertTrue(avatar_storage().exists(profile.avatar.name))
+        self.assertEqual(list(profile.avatar_thumbnails), [str(size) for size in thumbnails.SIZES])
+        for size, name in profile.avatar_thumbnails.items():
+            with avatar_storage().open(name) as fh:
+                image = Image.open(fh)
+                self.assertEqual((image.format, image.size), (thumbnails.FORMAT, (int(size), int(size))))
+        # Claimed already: a second worker gets nothing
+        self.assertFalse(avatars.process_job(job.pk))
+
+    def test_invalid_form_discards_upload(self):
+        response = self.post(email="not an email")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(AvatarJob.objects.exists())
+        self.assertEqual(self.staged(), [])
+
+    def test_non_image_is_rejected_and_discarded(self):
+        response = self.post(avatar=SimpleUploadedFile("avatar.png", b"not an image at all"))
+        self.assertFormError(response.context["p_form"], "avatar", "Upload a JPEG, PNG, GIF or WebP image.")
+        self.assertEqual(self.staged(), [])
+
+    def test_csrf_failure_discards_upload(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        # With a cookie present the token is looked up in request.POST,
+        # so the body (and the avatar) is read before the 403
+        client.cookies["csrftoken"] = "a" * 32
+        response = self.post(client, csrfmiddlewaretoken="b" * 32)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(AvatarJob.objects.exists())
+        self.assertEqual(self.staged(), [])
+
+    def test_anonymous_post_leaves_nothing_behind(self):
+        self.client.logout()
+        response = self.post()
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(AvatarJob.objects.exists())
+        self.assertEqual(self.staged(), [])
+
+
+class ImportExportTests(TestCase):
+    """
+    export_posts output imports back unchanged; malformed rows are skipped
+    with a message instead of aborting the batch.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user("alice", password="pw")
+        self.bob = User.objects.create_user("bob", password="pw")
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+    def path(self, name):
+        return os.path.join(self.tmp, name)
+
+    def import_rows(self, rows):
+        path = self.path("import.ndjson")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.writelines((row if isinstance(row, str) else json.dumps(row)) + "\n" for row in rows)
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_posts", path, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def snapshot(self):
+        return list(
+            Post.objects.order_by("id").values_list(
+                "title", "content", "author__username", "status", "created_at", "published_at",
+                "excerpt", "content_html",
+            )
+        )
+
+    def test_round_trip(self):
+        now = timezone.now().replace(microsecond=0)
+        Post.objects.create(title="First", content="Hello *world*", author=self.alice, created_at=now - timedelta(days=2))
+        Post.objects.create(
+            title="Draft", content="Later", author=self.bob, status=Post.Status.DRAFT, created_at=now,
+        )
+        Post.objects.create(
+            title="Scheduled", content="Soon", author=self.bob, status=Post.Status.SCHEDULED,
+            created_at=now, published_at=now + timedelta(days=1),
+        )
+        before = self.snapshot()
+        for fmt in ("ndjson", "csv"):
+            path = self.path(f"posts.{fmt}")
+            call_command("export_posts", format=fmt, output=path, stderr=StringIO())
+            Post.objects.all().delete()
+            call_command("import_posts", path, stdout=StringIO(), stderr=StringIO())
+            self.assertEqual(self.snapshot(), before)
+
+    def test_malformed_rows_are_skipped(self):
+        good = {"title": "Good", "content": "Body", "author": "alice"}
+        stdout, stderr = self.import_rows([
+            good,
+            {"title": "No author", "content": "Body"},
+            {"title": "No content", "author": "alice"},
+            {"title": "Bad date", "content": "Body", "author": "alice", "created_at": "yesterday"},
+            {"title": "Bad status", "content": "Body", "author": "alice", "status": "hidden"},
+            {"title": "Ghost", "content": "Body", "author": "ghost"},
+            {"title": "x" * 201, "content": "Body", "author": "alice"},
+            "[1, 2]",
+            {**good, "title": "Naive", "created_at": "2024-01-02T03:04:05", "status": "draft"},
+        ])
+        self.assertIn("Imported 2 posts, skipped 7.", stdout)
+        for message in (
+            "Record 2: missing author", "Record 3: missing content", "Record 4: invalid created_at 'yesterday'",
+            "Record 5: invalid status 'hidden'", "Unknown author 'ghost'", "Record 7: title longer",
+            "Record 8: expected an object",
+        ):
+            self.assertIn(message, stderr)
+        self.assertEqual(sorted(Post.objects.values_list("title", flat=True)), ["Good", "Naive"])
+        naive = Post.objects.get(title="Naive")
+        self.assertTrue(timezone.is_aware(naive.created_at))
+        self.assertIsNone(naive.published_at)
+
+
+class SearchTests(TestCase):
+    """
+    Search on SQLite goes through the FTS5 table; other non-PostgreSQL
+    databases get the icontains fallback.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("alice", password="pw")
+        cls.in_title = Post.objects.create(title="Django tips", content="Some <b>advice</b>.", author=cls.author)
+        cls.in_body = Post.objects.create(title="Notes", content="Working with django daily.", author=cls.author)
+        Post.objects.create(title="Django draft", content="Unfinished", author=cls.author, status=Post.Status.DRAFT)
+        Post.objects.create(title="Cooking", content="Nothing relevant", author=cls.author)
+
+    def titles(self, query, **kwargs):
+        return [post.title for post in search_posts(query, **kwargs)]
+
+    def test_fts_ranks_title_matches_first_and_skips_drafts(self):
+        self.assertEqual(self.titles("django"), ["Django tips", "Notes"])
+        self.assertEqual(self.titles("django", offset=1, limit=1), ["Notes"])
+        self.assertEqual(self.titles("   "), [])
+
+    def test_fts_headline_is_escaped_and_highlighted(self):
+        [post] = search_posts("advice")
+        self.assertIn("<mark>advice</mark>", post.headline)
+        self.assertIn("&lt;b&gt;", post.headline)
+
+    def test_fts_query_syntax_is_quoted(self):
+        self.assertEqual(self.titles('django OR "cooking'), [])
+        self.assertEqual(self.titles("NEAR(django"), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.in_body.content = "Now about flask"
+        self.in_body.save()
+        self.assertEqual(self.titles("django"), ["Django tips"])
+        self.assertEqual(self.titles("flask"), ["Notes"])
+        self.in_title.delete()
+        self.assertEqual(self.titles("django"), [])
+
+    def test_other_databases_fall_back_to_icontains(self):
+        with mock.patch.object(connection, "vendor", "mysql"):
+            results = search_posts("DJANGO")
+            self.assertEqual([post.title for post in results], ["Notes", "Django tips"])
+            self.assertEqual(self.titles("django advice"), ["Django tips"])
+        self.assertNotIn("<b>", results[1].headline)
+
+
+class PageCacheTests(TestCase):
+    """
+    Anonymous post pages come from the page cache at zero queries; only
+    the parameters that change the page are part of the key, and pages
+    carrying someone's flashed messages are never cached.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user("alice", password="pw")
+        cls.posts = [Post.objects.create(title=f"Post {i}", content="Body", author=author) for i in range(12)]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_hit_costs_no_queries(self):
+        url = reverse("post-list")
+        self.assertEqual(self.client.get(url).status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, "Post 11")
+        # Parameters the view ignores share the entry
+        with self.assertNumQueries(0):
+            self.client.get(url, {"utm_source": "x", "page": "7"})
+
+    def test_cursor_pages_are_cached_separately(self):
+        url = reverse("post-list")
+        self.client.get(url)
+        cursor = encode_cursor(self.posts[2], "published_at")
+        response = self.client.get(url, {"before": cursor})
+        self.assertContains(response, "Post 1")
+        self.assertNotContains(response, "Post 11")
+        with self.assertNumQueries(0):
+            self.client.get(url, {"before": cursor})
+
+    def test_edit_invalidates(self):
+        url = reverse("post-detail", args=[self.posts[0].pk])
+        self.client.get(url)
+        self.posts[0].title = "Renamed"
+        self.posts[0].save()
+        self.assertContains(self.client.get(url), "Renamed")
+
+    def test_pages_with_messages_are_not_cached(self):
+        request = RequestFactory().get(reverse("post-list"))
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        request._messages = default_storage(request)
+        messages.info(request, "Only for you")
+        response = PostListView.as_view()(request)
+        response.render()
+        self.assertContains(response, "Only for you")
+
+        response = self.client.get(reverse("post-list"))
+        self.assertNotContains(response, "Only for you")
+        with self.assertNumQueries(0):
+            self.client.get(reverse("post-list"))
+
+
+@override_settings(ALLOWED_HOSTS=["testserver", "blog.example.com", "mirror.example.org"])
+class FeedTests(TestCase):
+    """
+    Feeds are valid in all three formats, cached per host and revalidated
+    with their ETag.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user("alice", "alice@example.com", "pw")
+        bob = User.objects.create_user("bob", password="pw")
+        Post.objects.create(title="Hello & welcome", content="First *post*", author=cls.alice)
+        Post.objects.create(title="Bob's", content="Other", author=bob)
+        Post.objects.create(title="Draft", content="Hidden", author=cls.alice, status=Post.Status.DRAFT)
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, fmt, host="blog.example.com", username=None, **headers):
+        url = reverse("author-feed", args=[username, fmt]) if username else reverse("feed", args=[fmt])
+        response = self.client.get(url, headers={"host": host, **headers})
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, body.decode()
+
+    def test_rss(self):
+        response, body = self.get("rss")
+        self.assertEqual(response["Content-Type"], "application/rss+xml; charset=utf-8")
+        channel = ElementTree.fromstring(body).find("channel")
+        items = channel.findall("item")
+        self.assertEqual([item.findtext("title") for item in items], ["Bob's", "Hello & welcome"])
+        self.assertIsNone(items[0].find("author"))
+        self.assertEqual(items[0].findtext("{http://purl.org/dc/elements/1.1/}creator"), "bob")
+        self.assertTrue(items[1].findtext("link").startswith("http://blog.example.com/posts/"))
+
+    def test_atom_and_json(self):
+        _, body = self.get("atom", username="alice")
+        entries = ElementTree.fromstring(body).findall("{http://www.w3.org/2005/Atom}entry")
+        self.assertEqual(len(entries), 1)
+        _, body = self.get("json")
+        feed = json.loads(body)
+        self.assertEqual([item["title"] for item in feed["items"]], ["Bob's", "Hello & welcome"])
+        self.assertEqual(feed["items"][1]["content_html"], Post.objects.get(title="Hello & welcome").content_html)
+        self.assertEqual(self.get("xml")[0].status_code, 404)
+
+    def test_cache_and_etag_are_per_host(self):
+        response, body = self.get("rss")
+        etag = response["ETag"]
+        with self.assertNumQueries(1):
+            cached, cached_body = self.get("rss")
+        self.assertEqual(cached_body, body)
+        self.assertEqual(self.get("rss", **{"if-none-match": etag})[0].status_code, 304)
+
+        mirror, mirror_body = self.get("rss", host="mirror.example.org")
+        self.assertNotEqual(mirror["ETag"], etag)
+        self.assertIn("http://mirror.example.org/posts/", mirror_body)
+        self.assertNotIn("blog.example.com", mirror_body)
+
+    def test_query_string_shares_the_entry(self):
+        self.get("rss")
+        with self.assertNumQueries(1):
+            self.client.get(reverse("feed", args=["rss"]), {"utm_source": "x"}, headers={"host": "blog.example.com"})
+
+
+class AuthorRenameTests(TestCase):
+    """
+    Usernames are shown on every post page but live on the user row, so a
+    rename must change the validators and drop cached pages and feeds.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("alice", password="pw")
+        cls.post = Post.objects.create(title="Hello", content="Body", author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def rename(self):
+        self.author.username = "alicia"
+        self.author.save()
+
+    def test_detail_etag_reads_current_author(self):
+        url = reverse("post-detail", args=[self.post.pk])
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, headers={"if-none-match": etag}).status_code, 304)
+        self.rename()
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "alicia")
+
+    def test_list_and_feed_follow_rename(self):
+        list_url, feed_url = reverse("post-list"), reverse("feed", args=["rss"])
+        list_etag = self.client.get(list_url)["ETag"]
+        b"".join(self.client.get(feed_url).streaming_content)
+        self.rename()
+        response = self.client.get(list_url, headers={"if-none-match": list_etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "alicia")
+        self.assertIn(b"alicia", b"".join(self.client.get(feed_url).streaming_content))
+
+    def test_login_does_not_invalidate(self):
+        url = reverse("post-list")
+        self.client.get(url)
+        self.assertTrue(Client().login(username="alice", password="pw"))
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+
+class PostListQueryCountTests(TestCase):
+    """
+    Every page of the post list costs the same queries, whatever its
+    position, and the cursors walk the whole list exactly once.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        authors = [User.objects.create_user(f"author{i}", password="pw") for i in range(5)]
+        start = timezone.now() - timedelta(days=30)
+        cls.posts = Post.objects.bulk_create(
+            Post(
+                title=f"Post {i:02}", content="word " * 50, author=authors[i % 5],
+                published_at=start + timedelta(hours=i // 2),  # pairs share a timestamp
+            )
+            for i in range(25)
+        )
+        Post.objects.create(title="Draft", content="x", author=authors[0], status=Post.Status.DRAFT)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pages_walk_the_list_in_constant_queries(self):
+        url, params, titles = reverse("post-list"), {}, []
+        while True:
+            cache.clear()
+            # Validators aggregate + one page of posts with their authors
+            with self.assertNumQueries(2):
+                response = self.client.get(url, params)
+            page = response.context["page_obj"]
+            titles += [post.title for post in page]
+            if not page.has_next():
+                break
+            params = {"before": page.next_cursor}
+        expected = sorted(self.posts, key=lambda post: (post.published_at, post.pk), reverse=True)
+        self.assertEqual(titles, [post.title for post in expected])
+
+        # ...and back again
+        previous = response.context["page_obj"].previous_cursor
+        response = self.client.get(url, {"after": previous})
+        self.assertEqual([post.title for post in response.context["page_obj"]], titles[10:20])
+
+    def test_list_loads_only_rendered_columns(self):
+        response = self.client.get(reverse("post-list"))
+        post = response.context["posts"][0]
+        self.assertEqual(post.get_deferred_fields() & {"content", "content_html"}, {"content", "content_html"})
+        self.assertContains(response, "1 min read")
+
+    def test_bad_cursor_is_404(self):
+        self.assertEqual(self.client.get(reverse("post-list"), {"before": "garbage"}).status_code, 404)
+
+    def test_revalidation_is_one_query(self):
+        url = reverse("post-list")
+        etag = self.client.get(url)["ETag"]
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+
+
+class PostContentTests(TestCase):
+    """
+    Excerpts, reading time and the rendered HTML are derived on save, and
+    only when the content changes.
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user("alice", password="pw")
+
+    def test_summary_fields(self):
+        post = Post.objects.create(title="Long", content="word " * 450, author=self.author)
+        self.assertEqual((post.word_count, post.reading_time), (450, 3))
+        self.assertEqual(post.excerpt, "word " * 19 + "word…")
+
+    def test_content_is_rendered_safely(self):
+        post = Post.objects.create(title="XSS", content="Hi <script>alert(1)</script>", author=self.author)
+        self.assertNotIn("<script>", post.content_html)
+        self.assertEqual(post.content_hash, content_hash(post.content))
+
+    def test_rendering_follows_content_only(self):
+        post = Post.objects.create(title="One", content="First", author=self.author)
+        # Marker to tell whether anything re-rendered
+        Post.objects.filter(pk=post.pk).update(content_html="marker")
+        post.refresh_from_db()
+        post.title = "Two"
+        post.save(update_fields=["title"])
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.content_html, "marker")
+        post.content = "Second"
+        post.save(update_fields=["content"])
+        post.refresh_from_db()
+        self.assertIn("Second", post.content_html)
+        self.assertEqual(post.excerpt, "Second")
+
+    def test_detail_page_shows_stored_html(self):
+        rendered, empty = [
+            Post.objects.create(title=title, content="First", author=self.author) for title in ("One", "Two")
+        ]
+        Post.objects.filter(pk=rendered.pk).update(content_html="<p>marker</p>")
+        Post.objects.filter(pk=empty.pk).update(content_html="")
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("post-detail", args=[rendered.pk]))
+        self.assertContains(response, "<p>marker</p>", html=True)
+        # No fallback to the deferred raw content, which would cost a query
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(reverse("post-detail", args=[empty.pk]))
+        self.assertNotContains(response, "First</p>")
+
+
+class AuthorPagesTests(TestCase):
+    """
+    The author index and archive cost a fixed number of queries and only
+    count and show published posts to visitors.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [User.objects.create_user(f"author{i}", password="pw") for i in range(8)]
+        for author in cls.authors:
+            for i in range(5):
+                Post.objects.create(title=f"{author.username} {i}", content="Body", author=author)
+            Post.objects.create(title=f"{author.username} draft", content="x", author=author, status=Post.Status.DRAFT)
+
+    def test_author_index_queries_are_constant(self):
+        # COUNT for the paginator, authors with counts and profiles, latest posts
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("author-list"))
+        authors = response.context["authors"]
+        self.assertEqual(len(authors), 8)
+        self.assertEqual({author.post_count for author in authors}, {5})
+        self.assertEqual([post.title for post in authors[0].latest_posts], ["author0 4", "author0 3", "author0 2"])
+
+    def test_archive_shows_drafts_to_owner_only(self):
+        url = reverse("author-detail", args=["author0"])
+        response = self.client.get(url)
+        self.assertEqual(response.context["author"].post_count, 5)
+        self.assertNotContains(response, "author0 draft")
+        self.client.force_login(self.authors[0])
+        self.assertContains(self.client.get(url), "author0 draft")
+        self.client.force_login(self.authors[1])
+        self.assertNotContains(self.client.get(url), "author0 draft")
+
+    def test_unknown_author_is_404(self):
+        self.assertEqual(self.client.get(reverse("author-detail", args=["nobody"])).status_code, 404)
+
+
+class ProfileBackendTests(TestCase):
+    """
+    Profiles exist from sign-up and come with the session user, so the
+    profile page never creates or fetches one separately.
+    """
+
+    def test_profile_is_provisioned_and_loaded_with_the_user(self):
+        user = User.objects.create_user("alice", "alice@example.com", "pw")
+        self.assertTrue(Profile.objects.filter(user=user).exists())
+        self.client.force_login(user)
+        # Session, user joined with profile
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("profile"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_accounts_without_profile_get_one(self):
+        user = User.objects.create_user("bob", password="pw")
+        Profile.objects.filter(user=user).delete()
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(reverse("profile")).status_code, 200)
+        self.assertTrue(Profile.objects.filter(user=user).exists())
+
+
+class ScheduledPublishingTests(TestCase):
+    """
+    Drafts and scheduled posts stay private until publish_scheduled makes
+    them live.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user("alice", password="pw")
+        now = timezone.now()
+        self.due = Post.objects.create(
+            title="Due", content="x", author=self.author, status=Post.Status.SCHEDULED,
+            published_at=now - timedelta(minutes=1),
+        )
+        self.later = Post.objects.create(
+            title="Later", content="x", author=self.author, status=Post.Status.SCHEDULED,
+            published_at=now + timedelta(days=1),
+        )
+
+    def test_scheduled_posts_are_private(self):
+        url = reverse("post-detail", args=[self.due.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertNotContains(self.client.get(reverse("post-list")), "Due")
+        self.assertEqual(search_posts("x"), [])
+        self.client.force_login(self.author)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_publish_scheduled_publishes_due_posts(self):
+        # Warm the page cache; publishing must invalidate it
+        self.client.get(reverse("post-list"))
+        stdout = StringIO()
+        call_command("publish_scheduled", stdout=stdout)
+        self.assertIn("Published 1 scheduled posts.", stdout.getvalue())
+        self.due.refresh_from_db()
+        self.later.refresh_from_db()
+        self.assertEqual((self.due.status, self.later.status), (Post.Status.PUBLISHED, Post.Status.SCHEDULED))
+        self.assertContains(self.client.get(reverse("post-list")), "Due")
+        self.assertEqual([post.title for post in search_posts("x")], ["Due"])
+        # Nothing left to do
+        call_command("publish_scheduled", stdout=stdout)
+        self.assertEqual(Post.objects.filter(status=Post.Status.PUBLISHED).count(), 1)
+
+    def test_form_validation(self):
+        now = timezone.now()
+        cases = [
+            ({"status": "scheduled"}, "published_at"),
+            ({"status": "scheduled", "published_at": now - timedelta(hours=1)}, "published_at"),
+            ({"status": "published", "published_at": now + timedelta(hours=1)}, "status"),
+        ]
+        for data, field in cases:
+            form = PostForm({"title": "T", "content": "C", **data})
+            self.assertFalse(form.is_valid())
+            self.assertIn(field, form.errors)
+        form = PostForm({"title": "T", "content": "C", "status": "draft", "published_at": now})
+        self.assertTrue(form.is_valid())
+        self.assertIsNone(form.cleaned_data["published_at"])
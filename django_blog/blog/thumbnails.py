@@ -0,0 +1,78 @@
+"""
+Avatar thumbnails for blog profiles.
+
+A newly uploaded avatar is rendered once into fixed-size square variants
+(48, 128 and 512px by default) on a background thread, and the storage
+names are kept in Profile.avatar_thumbnails so templates can link the
+small files instead of the original upload.
+render_thumbnails() and delete_thumbnails() are the same code as in
+social_media_api's accounts.thumbnails: the two projects deploy separately
+and share no package, so a fix to one belongs in both.
+"""
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection
+from PIL import Image, ImageOps, features
+
+from .models import Profile
+
+SIZES = getattr(settings, "AVATAR_THUMBNAIL_SIZES", (48, 128, 512))
+FORMAT = "WEBP" if features.check("webp") else "JPEG"
+
+executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "THUMBNAIL_WORKERS", 2),
+    thread_name_prefix="thumbnails",
+)
+
+
+def render_thumbnails(field_file, sizes=SIZES):
+    """
+    Render square `sizes` variants of `field_file` into its storage and
+    return {str(size): storage name}.
+    """
+    storage = field_file.storage
+    directory, filename = posixpath.split(field_file.name)
+    stem = posixpath.splitext(filename)[0]
+
+    with field_file.open("rb") as fh:
+        image = ImageOps.exif_transpose(Image.open(fh))
+        image.load()
+    image = image.convert("RGBA" if FORMAT == "WEBP" and "A" in image.getbands() else "RGB")
+
+    names = {}
+    for size in sizes:
+        thumb = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        thumb.save(buffer, FORMAT, quality=80)
+        name = posixpath.join(directory, "thumbs", f"{stem}_{size}.{FORMAT.lower()}")
+        names[str(size)] = storage.save(name, ContentFile(buffer.getvalue()))
+    return names
+
+
+def delete_thumbnails(storage, names):
+    for name in names.values():
+        storage.delete(name)
+
+
+def build_avatar_thumbnails(profile_pk):
+    """
+    Background job: render thumbnails for the profile's current avatar.
+    """
+    try:
+        profile = Profile.objects.only("pk", "avatar", "avatar_thumbnails").get(pk=profile_pk)
+        if not profile.avatar:
+            return
+        names = render_thumbnails(profile.avatar)
+        # Only record them if the avatar wasn't replaced in the meantime
+        updated = Profile.objects.filter(pk=profile_pk, avatar=profile.avatar.name).update(
+            avatar_thumbnails=names,
+        )
+        delete_thumbnails(profile.avatar.storage, profile.avatar_thumbnails if updated else names)
+    except Profile.DoesNotExist:
+        pass
+    finally:
+        connection.close()
@@ -0,0 +1,131 @@
+"""
+Streamed avatar uploads.
+
+AvatarUploadHandler writes the "avatar" part of a multipart request to a
+staging file in the avatar storage chunk by chunk, as it arrives, instead
+of buffering it in memory or a temp file and copying it afterwards. The
+request then only records an AvatarJob; decoding, resizing and EXIF
+stripping happen in the background (see blog.avatars).
+"""
+import os
+import posixpath
+import uuid
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+from .models import Profile
+
+STAGING_DIR = "avatars/incoming"
+MAX_UPLOAD_SIZE = getattr(settings, "AVATAR_MAX_UPLOAD_SIZE", 10 * 1024 * 1024)
+HEADER_SIZE = 16
+
+# File signatures of the formats accepted as avatars
+SIGNATURES = (b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n", b"GIF87a", b"GIF89a")
+
+
+def avatar_storage():
+    return Profile._meta.get_field("avatar").storage
+
+
+def staging_name(file_name=""):
+    return posixpath.join(STAGING_DIR, uuid.uuid4().hex + os.path.splitext(file_name)[1].lower())
+
+
+def looks_like_image(header):
+    """
+    Cheap magic-number check; the worker does the real decoding.
+    """
+    return header.startswith(SIGNATURES) or (header[:4] == b"RIFF" and header[8:12] == b"WEBP")
+
+
+class StagedAvatarFile(UploadedFile):
+    """
+    An avatar already written to storage under `staged_name`.
+    `header` holds its first bytes for the type check.
+    """
+
+    def __init__(self, staged_name, name, content_type, size, charset, header):
+        super().__init__(None, name, content_type, size, charset)
+        self.staged_name = staged_name
+        self.header = header
+        self.claimed = False
+
+    def claim(self):
+        """
+        Mark the staged file as handed over (to an AvatarJob), so the
+        request no longer deletes it on the way out.
+        """
+        self.claimed = True
+
+    def discard(self):
+        avatar_storage().delete(self.staged_name)
+
+
+class AvatarUploadHandler(FileUploadHandler):
+    """
+    Stream the "avatar" file field straight into the avatar storage.
+    Only storages with local paths can be appended to; with any other
+    storage (or for other fields) the handler steps aside and the default
+    handlers take over.
+    Bytes past MAX_UPLOAD_SIZE are counted but not written, so the form
+    can reject the upload without it filling the disk.
+    Staged files nobody claimed by the end of the request (failed CSRF or
+    login check, invalid form, an exception) are removed by
+    discard_unclaimed().
+    """
+    field_name = "avatar"
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.staged_files = []
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.destination = None
+        if field_name != self.field_name:
+            return
+        storage = avatar_storage()
+        self.staged_name = staging_name(file_name)
+        try:
+            path = storage.path(self.staged_name)
+        except NotImplementedError:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.destination = open(path, "wb")
+        self.received = 0
+        self.header = b""
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.destination is None:
+            return raw_data
+        if len(self.header) < HEADER_SIZE:
+            self.header += raw_data[:HEADER_SIZE - len(self.header)]
+        if self.received + len(raw_data) <= MAX_UPLOAD_SIZE:
+            self.destination.write(raw_data)
+        self.received += len(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.destination is None:
+            return None
+        self.destination.close()
+        self.destination = None
+        staged = StagedAvatarFile(
+            self.staged_name, self.file_name, self.content_type, file_size, self.charset, self.header,
+        )
+        self.staged_files.append(staged)
+        return staged
+
+    def upload_interrupted(self):
+        if getattr(self, "destination", None) is not None:
+            self.destination.close()
+            self.destination = None
+            avatar_storage().delete(self.staged_name)
+
+    def discard_unclaimed(self):
+        for staged in self.staged_files:
+            if not staged.claimed:
+                staged.discard()
+        self.staged_files = []
@@ -3,7 +3,8 @@ from django.urls import path
 from . import views
 from .views import (
     PostListView, PostDetailView,
-    PostCreateView, PostUpdateView, PostDeleteView
+    PostCreateView, PostUpdateView, PostDeleteView,
+    AuthorListView, AuthorPostListView,
 )
 
 urlpatterns = [
@@ -12,9 +13,14 @@ urlpatterns = [
     path('logout/', auth_views.LogoutView.as_view(template_name='blog/logout.html'), name='logout'),
     path('register/', views.register, name='register'),
     path('profile/', views.profile, name='profile'),
+    path('search/', views.search, name='search'),
     path('posts/', PostListView.as_view(template_name='blog/post_list.html'), name="post-list"),
     path('posts/new/', PostCreateView.as_view(), name="post-create"),
     path('posts/<int:pk>/', PostDetailView.as_view(), name="post-detail"),
     path('posts/<int:pk>/edit/', PostUpdateView.as_view(), name="post-edit"),
     path('posts/<int:pk>/delete/', PostDeleteView.as_view(), name="post-delete"),
+    path('authors/', AuthorListView.as_view(), name="author-list"),
+    path('authors/<str:username>/', AuthorPostListView.as_view(), name="author-detail"),
+    path('feeds/<str:fmt>/', views.feed, name="feed"),
+    path('authors/<str:username>/feeds/<str:fmt>/', views.feed, name="author-feed"),
 ]
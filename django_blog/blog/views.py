@@ -1,24 +1,145 @@
 from django.contrib import messages
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
-from django.shortcuts import redirect, render
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from .forms import RegistrationForm, UserUpdateForm, ProfileUpdateForm
 
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.urls import reverse_lazy
+from django.contrib.auth.models import User
+from django.urls import reverse, reverse_lazy
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from .models import Post
 from .forms import PostForm
+from django.db.models import Count, Max, Prefetch, Q
+from . import feeds
+from .caching import (
+    LIST_GENERATION, AnonymousPageCacheMixin, ConditionalGetMixin, generation_state, make_etag,
+    post_generation,
+)
+from .pagination import KeysetPaginationMixin
+from .search import search_posts
+from .uploads import AvatarUploadHandler
 
-class PostListView(ListView):
+SEARCH_PAGE_SIZE = 10
+LATEST_POSTS_PER_AUTHOR = 3
+# Columns the post list templates render
+POST_LIST_FIELDS = ("id", "title", "excerpt", "reading_time", "published_at", "author__id", "author__username")
+
+class PostListView(AnonymousPageCacheMixin, ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = Post
     template_name = "blog/post_list.html"
     context_object_name = "posts"
+    paginate_by = 10
+    cursor_field = "published_at"
+    page_cache_params = ("before", "after")
+
+    def page_cache_generations(self):
+        return [LIST_GENERATION]
+
+    def get_validators(self):
+        # Any edit bumps MAX(updated_at) and any delete changes the count,
+        # so together they version every page of the list; author renames
+        # only show in the list generation
+        state = Post.objects.published().aggregate(last_modified=Max("updated_at"), count=Count("id"))
+        etag = make_etag(
+            self.request, self.request.get_full_path(), state["last_modified"], state["count"],
+            generation_state([LIST_GENERATION]),
+        )
+        return etag, state["last_modified"]
+
+    def get_queryset(self):
+        # Only the columns post_list.html renders (the precomputed excerpt,
+        # never the full content), author in the same query
+        return Post.objects.published().select_related("author").only(*POST_LIST_FIELDS)
 
-class PostDetailView(DetailView):
+class PostDetailView(AnonymousPageCacheMixin, ConditionalGetMixin, DetailView):
     model = Post
     template_name = "blog/post_detail.html"
 
+    def page_cache_generations(self):
+        return [post_generation(self.kwargs["pk"])]
+
+    def get_validators(self):
+        # The author's username comes from the current user row (same
+        # query), so a rename changes the ETag though updated_at doesn't
+        row = (
+            self.visible_posts().filter(pk=self.kwargs["pk"])
+            .values_list("updated_at", "author__username").first()
+        )
+        if row is None:
+            return None, None
+        updated_at, author = row
+        return make_etag(self.request, self.kwargs["pk"], updated_at, author), updated_at
+
+    def visible_posts(self):
+        # Drafts and scheduled posts are only visible to their author
+        posts = Post.objects.all()
+        if self.request.user.is_authenticated:
+            return posts.filter(Q(status=Post.Status.PUBLISHED) | Q(author=self.request.user))
+        return posts.published()
+
+    def get_queryset(self):
+        # The page shows content_html; the raw content isn't needed
+        return self.visible_posts().select_related("author").defer("content", "search_vector")
+
+class AuthorListView(ListView):
+    """
+    Every author with their post count and latest posts. Counts are
+    annotated and the latest posts come from one windowed prefetch, so a
+    page costs the same handful of queries however many authors it shows.
+    """
+    template_name = "blog/author_list.html"
+    context_object_name = "authors"
+    paginate_by = 20
+
+    def get_queryset(self):
+        latest = (
+            Post.objects.published()
+            .only("id", "title", "published_at", "author_id")
+            .order_by("-published_at", "-id")[:LATEST_POSTS_PER_AUTHOR]
+        )
+        return (
+            User.objects.select_related("profile")
+            .annotate(post_count=Count("posts", filter=Q(posts__status=Post.Status.PUBLISHED)))
+            .filter(post_count__gt=0)
+            .prefetch_related(Prefetch("posts", queryset=latest, to_attr="latest_posts"))
+            .order_by("username")
+        )
+
+class AuthorPostListView(KeysetPaginationMixin, ListView):
+    """
+    An author's archive: their profile and all their posts, newest first.
+    """
+    template_name = "blog/author_detail.html"
+    context_object_name = "posts"
+    cursor_field = "published_at"
+
+    def get_queryset(self):
+        self.author = get_object_or_404(
+            User.objects.select_related("profile").annotate(
+                post_count=Count("posts", filter=Q(posts__status=Post.Status.PUBLISHED)),
+            ),
+            username=self.kwargs["username"],
+        )
+        return (
+            Post.objects.published().filter(author=self.author)
+            .select_related("author").only(*POST_LIST_FIELDS)
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(author=self.author, **kwargs)
+        if self.request.user == self.author:
+            context["unpublished"] = (
+                self.author.posts.exclude(status=Post.Status.PUBLISHED)
+                .only("id", "title", "status", "published_at", "author_id")
+                .order_by("-created_at")
+            )
+        return context
+
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostForm
@@ -50,6 +171,73 @@ class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         post = self.get_object()
         return self.request.user == post.author
 
+def search(request):
+    """
+    Ranked full-text search over posts (?q=...), SEARCH_PAGE_SIZE per page.
+    """
+    query = request.GET.get("q", "").strip()
+    try:
+        page = max(1, int(request.GET.get("page", 1)))
+    except ValueError:
+        page = 1
+    # Fetch one extra row to know whether there is a next page without a COUNT
+    results = search_posts(query, offset=(page - 1) * SEARCH_PAGE_SIZE, limit=SEARCH_PAGE_SIZE + 1)
+    context = {
+        "query": query,
+        "results": results[:SEARCH_PAGE_SIZE],
+        "page": page,
+        "has_next": len(results) > SEARCH_PAGE_SIZE,
+    }
+    return render(request, "blog/search.html", context)
+
+def feed(request, fmt, username=None):
+    """
+    RSS (fmt="rss"), Atom ("atom") or JSON Feed ("json") of the latest
+    posts, site-wide or for one author.
+    """
+    if fmt not in feeds.GENERATORS:
+        raise Http404("Unknown feed format.")
+    posts = Post.objects.published()
+    title = "django_blog"
+    link = reverse("post-list")
+    if username is not None:
+        author = get_object_or_404(User, username=username)
+        posts = posts.filter(author=author)
+        title = f"django_blog: {author.username}"
+        link = reverse("author-detail", args=[author.username])
+
+    # Query strings don't change the feed; leave them out of the key
+    feed_url = request.build_absolute_uri(request.path)
+    # One aggregate query decides between 304, the cached body and a render
+    state = posts.aggregate(last_modified=Max("updated_at"), count=Count("id"))
+    etag = feeds.feed_etag(
+        fmt, feed_url, state["last_modified"], state["count"], generation_state([LIST_GENERATION]),
+    )
+    last_modified = state["last_modified"] and int(state["last_modified"].timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        body = feeds.get_cached(etag)
+        if body is not None:
+            response = HttpResponse(body, content_type=feeds.CONTENT_TYPES[fmt])
+        else:
+            meta = {
+                "title": title,
+                "link": request.build_absolute_uri(link),
+                "feed_url": feed_url,
+                "updated": state["last_modified"],
+            }
+            rows = posts.order_by("-published_at", "-id").values(*feeds.ITEM_FIELDS)[:feeds.FEED_ITEMS]
+            items = (
+                {**row, "url": request.build_absolute_uri(reverse("post-detail", args=[row["id"]]))}
+                for row in rows.iterator(chunk_size=100)
+            )
+            chunks = feeds.caching(feeds.GENERATORS[fmt](meta, items), etag)
+            response = StreamingHttpResponse(chunks, content_type=feeds.CONTENT_TYPES[fmt])
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
 def home(request):
     return render(request, "blog/home.html")
 
@@ -73,25 +261,45 @@ def register(request):
         form = RegistrationForm()
     return render(request, "blog/register.html", {"form": form})
 
-@login_required
+@csrf_exempt
 def profile(request):
     """
     Authenticated users can view/update their profile.
     Supports updating first/last name, email, bio, and avatar.
     """
+    # Upload handlers must be set before anything reads request.POST,
+    # which is why CSRF is checked afterwards, in _profile. Whatever the
+    # outcome (403, login redirect, invalid form, error), a staged upload
+    # that wasn't queued as an AvatarJob is deleted here.
+    handler = AvatarUploadHandler(request)
+    request.upload_handlers.insert(0, handler)
+    try:
+        return _profile(request)
+    finally:
+        handler.discard_unclaimed()
+
+@login_required
+@csrf_protect
+def _profile(request):
+    # Loaded with the user by ProfileModelBackend
+    user_profile = request.user.profile
     if request.method == "POST":
         u_form = UserUpdateForm(request.POST, instance=request.user)
-        p_form = ProfileUpdateForm(request.POST, request.FILES, instance=request.user.profile)
+        p_form = ProfileUpdateForm(request.POST, request.FILES, instance=user_profile)
         if u_form.is_valid() and p_form.is_valid():
             u_form.save()
             p_form.save()
-            messages.success(request, "Your profile has been updated.")
+            if p_form.cleaned_data.get("avatar"):
+                messages.success(request, "Your profile has been updated. Your new avatar will appear shortly.")
+            else:
+                messages.success(request, "Your profile has been updated.")
             return redirect("profile")
         else:
+            p_form.discard_upload()
             messages.error(request, "Please fix the highlighted errors.")
     else:
         u_form = UserUpdateForm(instance=request.user)
-        p_form = ProfileUpdateForm(instance=request.user.profile)
+        p_form = ProfileUpdateForm(instance=user_profile)
 
     context = {"u_form": u_form, "p_form": p_form}
     return render(request, "blog/profile.html", context)
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -92,6 +93,36 @@ DATABASES = {
 }
 
 
+# Caches
+# Post pages are cached and invalidated through blog.caching. LocMemCache is
+# per-process; point this at Redis/Memcached when running several workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 10
+
+
+# Avatar uploads
+# Uploads are streamed to storage and processed by blog.avatars: "thread"
+# runs jobs in-process right after the request, "db" leaves them queued for
+# `manage.py process_avatar_jobs`.
+
+AVATAR_JOB_RUNNER = 'thread'
+AVATAR_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+
+# Authentication
+# Loads request.user together with its blog Profile (one query, not two)
+
+AUTHENTICATION_BACKENDS = [
+    'blog.backends.ProfileModelBackend',
+]
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -6,5 +6,8 @@ from .models import User
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
   fieldsets = BaseUserAdmin.fieldsets + (
-    ('Profile', {'fields': ('bio', 'profile_picture', 'followers')}),
-  )
\ No newline at end of file
+    ('Profile', {'fields': ('bio', 'profile_picture', 'followers', 'follower_count', 'following_count')}),
+  )
+  # Follows must go through add_follower/remove_follower: a plain M2M save
+  # would skip the counters and the follow signals
+  readonly_fields = ('followers', 'follower_count', 'following_count')
\ No newline at end of file
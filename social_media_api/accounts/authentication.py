@@ -0,0 +1,175 @@
+"""
+Token authentication with a token -> user lookup cache.
+
+DRF's TokenAuthentication runs a Token JOIN User query on every request.
+CachedTokenAuthentication keeps resolved tokens in a small per-process
+LRU, optionally backed by one of Django's caches as a tier shared by every
+worker. Entries are dropped from both when a token is deleted or
+regenerated (logout) and whenever its user is saved (password change,
+deactivation) or their follower counters move.
+
+Invalidation only reaches the in-process LRU of the worker that made the
+change, so other workers can keep accepting a revoked token for up to
+LOCAL_TTL seconds; keep it short. Only name a shared tier in CACHE_ALIAS
+if that cache really is shared by every worker (Redis, Memcached,
+database): a per-process LocMemCache would refill each worker's LRU from
+its own stale copy for the full TTL.
+
+Settings (all optional):
+
+    TOKEN_AUTH_CACHE = {
+        'MAX_SIZE': 10_000,     # entries kept in each in-process LRU
+        'LOCAL_TTL': 5,         # seconds an in-process entry is trusted
+        'TTL': 60,              # seconds a shared entry is trusted
+        'CACHE_ALIAS': None,    # a cache shared by all workers, e.g. 'default'
+    }
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .signals import follow_created, follow_removed
+
+
+class TokenCache:
+    key_prefix = 'authtoken:'
+
+    def __init__(self, max_size=10_000, local_ttl=5, ttl=60, cache_alias=None):
+        self.max_size = max_size
+        self.local_ttl = min(local_ttl, ttl)
+        self.ttl = ttl
+        self.cache_alias = cache_alias
+        self._entries = OrderedDict()  # key -> (expires_at, user, token)
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'TOKEN_AUTH_CACHE', {})
+        return cls(
+            max_size=options.get('MAX_SIZE', 10_000),
+            local_ttl=options.get('LOCAL_TTL', 5),
+            ttl=options.get('TTL', 60),
+            cache_alias=options.get('CACHE_ALIAS'),
+        )
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias] if self.cache_alias else None
+
+    def get(self, key):
+        """
+        Return (user, token) for `key`, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return entry[1], entry[2]
+                self._discard(key)
+
+        if self.shared is not None:
+            found = self.shared.get(self.key_prefix + key)
+            if found is not None:
+                self._remember(key, *found)
+                return found
+        return None
+
+    def set(self, key, user, token):
+        self._remember(key, user, token)
+        if self.shared is not None:
+            self.shared.set(self.key_prefix + key, (user, token), self.ttl)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._discard(key)
+        if self.shared is not None:
+            self.shared.delete(self.key_prefix + key)
+
+    def invalidate_user(self, user_pk):
+        self.invalidate_users([user_pk])
+
+    def invalidate_users(self, user_pks):
+        with self._lock:
+            keys = {key for pk in user_pks for key in self._keys_by_user.get(pk, ())}
+        if self.shared is not None:
+            # Other workers may have cached keys this process never saw
+            keys.update(Token.objects.filter(user_id__in=user_pks).values_list('key', flat=True))
+        for key in keys:
+            self.invalidate(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _remember(self, key, user, token):
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + self.local_ttl, user, token)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key):
+        # Caller holds the lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_user.get(entry[1].pk)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[entry[1].pk]
+
+
+token_cache = TokenCache.from_settings()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for rest_framework.authentication.TokenAuthentication.
+    """
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            user, token = cached
+            # Requests may mutate request.user; never hand out the shared copy
+            return copy.copy(user), token
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token)
+        return copy.copy(user), token
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
+
+@receiver(post_save, sender=Token)
+def invalidate_saved_token(sender, instance, created, **kwargs):
+    # A new key is never cached yet, and the key it replaces was deleted
+    # (post_delete above); only a re-saved token needs dropping
+    if not created:
+        token_cache.invalidate_user(instance.user_id)
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    # Covers password changes and deactivation
+    if not created:
+        token_cache.invalidate_user(instance.pk)
+
+@receiver(follow_created)
+@receiver(follow_removed)
+def invalidate_follow_counts(sender, follower, targets, **kwargs):
+    # Counters are written with update(), which skips post_save
+    token_cache.invalidate_users([follower.pk] + [target.pk for target in targets])
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .hashing import ahash_dummy_password, averify_password
+
+
+class HashPoolModelBackend(ModelBackend):
+    """
+    ModelBackend whose async path hashes on the pool from accounts.hashing.
+    Django's own aauthenticate() verifies the password on the event loop,
+    stalling every other request for the length of a hash.
+    """
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await UserModel._default_manager.aget_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            await ahash_dummy_password(password)
+            return None
+        if await averify_password(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,28 @@
+"""
+Password hashers with parameters tuned for the API's login/register
+endpoints. Parameters can be overridden with settings.PASSWORD_HASHER_PARAMS,
+e.g.
+
+    PASSWORD_HASHER_PARAMS = {
+        'argon2': {'time_cost': 2, 'memory_cost': 19456, 'parallelism': 1},
+    }
+
+Each encoded hash records its own parameters, so changing them never breaks
+existing passwords; they are re-hashed with the new values on next login.
+scrypt needs no tuning: Django's ScryptPasswordHasher already uses the
+OWASP parameters (N=2**14, r=8, p=1).
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+_params = getattr(settings, 'PASSWORD_HASHER_PARAMS', {})
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id with the OWASP baseline (19 MiB, 2 passes, 1 lane) instead of
+    Django's 100 MiB / 8 lanes. Requires the argon2-cffi package.
+    """
+    time_cost = _params.get('argon2', {}).get('time_cost', 2)
+    memory_cost = _params.get('argon2', {}).get('memory_cost', 19456)
+    parallelism = _params.get('argon2', {}).get('parallelism', 1)
@@ -0,0 +1,60 @@
+"""
+Password verification off the event loop.
+
+Under ASGI, Django runs sync views (and sync_to_async work) on one shared
+thread by default, so a slow password hash stalls every other sync request.
+These helpers run the hashing on a bounded pool of PASSWORD_HASH_WORKERS
+threads instead. hashlib's scrypt/PBKDF2 and argon2-cffi release the GIL, so
+the pool scales with cores while the bound keeps login storms from
+starving the rest of the process.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, identify_hasher, make_password
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1,
+    thread_name_prefix='password-hash',
+)
+
+
+def _verify(raw_password, encoded):
+    """
+    Return (is_valid, needs_rehash). Pure CPU, no database access.
+    """
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False, False
+    if not hasher.verify(raw_password, encoded):
+        return False, False
+    preferred = get_hasher('default')
+    return True, hasher.algorithm != preferred.algorithm or hasher.must_update(encoded)
+
+
+async def run_in_hash_pool(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, func, *args)
+
+
+async def averify_password(user, raw_password):
+    """
+    Check `raw_password` against `user` on the hash pool, upgrading the
+    stored hash to the preferred hasher like User.check_password does.
+    """
+    valid, needs_rehash = await run_in_hash_pool(_verify, raw_password, user.password)
+    if valid and needs_rehash:
+        user.password = await run_in_hash_pool(make_password, raw_password)
+        await type(user).objects.filter(pk=user.pk).aupdate(password=user.password)
+    return valid
+
+
+async def ahash_dummy_password(raw_password):
+    """
+    Burn one hash for unknown usernames so response time doesn't reveal
+    whether an account exists (mirrors ModelBackend.authenticate).
+    """
+    await run_in_hash_pool(make_password, raw_password)
@@ -0,0 +1,51 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, ScryptPasswordHasher
+from django.core.management.base import BaseCommand
+
+from accounts.hashers import TunedArgon2PasswordHasher
+
+PROFILES = {
+    'pbkdf2': PBKDF2PasswordHasher,
+    'scrypt': ScryptPasswordHasher,
+    'argon2': TunedArgon2PasswordHasher,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Report login throughput (password verifications per second) for each "
+        "PASSWORD_HASHER_PROFILE, on one core and on a PASSWORD_HASH_WORKERS-"
+        "sized pool. Verification dominates the cost of a login request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=20, help='Verifications timed per configuration.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+
+    def handle(self, *args, **options):
+        rounds, workers = options['rounds'], options['workers']
+        self.stdout.write(f"{'profile':<8} {'verify':>10} {'logins/s/core':>14} "
+                          f"{f'pool x{workers} logins/s':>20}")
+        for name, hasher_class in PROFILES.items():
+            hasher = hasher_class()
+            try:
+                encoded = hasher.encode('correct-horse-battery', hasher.salt())
+            except ValueError as exc:
+                # argon2-cffi is optional
+                self.stdout.write(f'{name:<8} skipped: {exc}')
+                continue
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                hasher.verify('correct-horse-battery', encoded)
+            single = (time.perf_counter() - start) / rounds
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                start = time.perf_counter()
+                list(pool.map(lambda _: hasher.verify('correct-horse-battery', encoded), range(rounds)))
+                pooled = rounds / (time.perf_counter() - start)
+
+            self.stdout.write(f'{name:<8} {single * 1000:>8.1f}ms {1 / single:>14.1f} {pooled:>20.1f}')
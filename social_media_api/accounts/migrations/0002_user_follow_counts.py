@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_follow_counts(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    Follow = User.followers.through
+
+    def count_by(column):
+        return Coalesce(Subquery(
+            Follow.objects.filter(**{column: OuterRef('pk')})
+            .values(column)
+            .annotate(n=Count('pk'))
+            .values('n')
+        ), 0)
+
+    User.objects.update(
+        follower_count=count_by('from_user'),
+        following_count=count_by('to_user'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='follower_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_follow_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:09
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_follow_counts'),
+    ]
+
+    # The auto-created through table only has a unique (from_user_id,
+    # to_user_id) index; this one gives "following" listings the same
+    # index-ordered keyset scan.
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX accounts_user_followers_to_from_idx '
+            'ON accounts_user_followers (to_user_id, from_user_id)',
+            reverse_sql='DROP INDEX accounts_user_followers_to_from_idx',
+        ),
+    ]
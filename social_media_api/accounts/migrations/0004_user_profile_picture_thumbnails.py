@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_followers_reverse_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture_thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
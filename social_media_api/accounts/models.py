@@ -1,17 +1,140 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+
+from .signals import follow_created, follow_removed
 
 # Create your models here.
 
+def _lock_users(pks):
+    """
+    Row-lock the given users for the rest of the transaction, always in pk
+    order so two follow operations over the same accounts can't deadlock.
+    Every follow-graph write locks both ends of the edges it touches, which
+    serializes writes to the same edge and keeps the counters exact.
+    (SQLite ignores FOR UPDATE; it serializes all writers anyway.)
+    """
+    list(User.objects.select_for_update().filter(pk__in=pks).order_by('pk').values_list('pk', flat=True))
+
 class User(AbstractUser):
     bio = models.TextField(blank=True)
     profile_picture = models.ImageField(upload_to='profiles/', blank=True, null=True)
+    # {"48": <storage name>, "128": ..., "512": ...}; see accounts.thumbnails
+    profile_picture_thumbnails = models.JSONField(default=dict, blank=True, editable=False)
     followers = models.ManyToManyField(
         'self',
         symmetrical=False,
         related_name='following',
         blank=True,
     )
+    # Denormalized sizes of the follow graph so profiles never have to
+    # count (or load) the whole followers table.
+    follower_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
-        return self.username
\ No newline at end of file
+        return self.username
+
+    def add_follower(self, user):
+        """
+        Make `user` follow this account and bump both counters.
+        Returns False if the follow already existed.
+        """
+        Follow = User.followers.through
+        with transaction.atomic():
+            _lock_users([self.pk, user.pk])
+            try:
+                # The (from_user, to_user) unique index arbitrates races
+                with transaction.atomic():
+                    Follow.objects.create(from_user=self, to_user=user)
+            except IntegrityError:
+                return False
+            self._adjust_follow_counts(user, 1)
+            follow_created.send(sender=User, follower=user, targets=[self])
+        return True
+
+    def remove_follower(self, user):
+        """
+        Make `user` stop following this account and decrement both counters.
+        Returns False if there was nothing to remove.
+        """
+        Follow = User.followers.through
+        with transaction.atomic():
+            _lock_users([self.pk, user.pk])
+            deleted, _ = Follow.objects.filter(from_user=self, to_user=user).delete()
+            if not deleted:
+                return False
+            self._adjust_follow_counts(user, -1)
+            follow_removed.send(sender=User, follower=user, targets=[self])
+        return True
+
+    def toggle_follower(self, user):
+        """
+        Follow if not following yet, otherwise unfollow. Returns True when
+        `user` ends up following this account.
+        """
+        with transaction.atomic():
+            if self.remove_follower(user):
+                return False
+            # Either we created the edge or a concurrent request just did
+            self.add_follower(user)
+            return True
+
+    def follow_many(self, targets):
+        """
+        Follow every account in `targets` with one existence query and one
+        bulk insert. Returns the ids of the accounts newly followed.
+        """
+        Follow = User.followers.through
+        targets = {target.pk: target for target in targets if target.pk != self.pk}
+        with transaction.atomic():
+            # With every endpoint locked no concurrent follow/unfollow can
+            # touch these edges, so the existence query stays true until
+            # commit and the counters move by exactly the rows inserted
+            _lock_users([self.pk, *targets])
+            existing = set(
+                Follow.objects.filter(to_user=self, from_user__in=targets).values_list('from_user_id', flat=True)
+            )
+            new_ids = [pk for pk in targets if pk not in existing]
+            if not new_ids:
+                return set()
+            Follow.objects.bulk_create(
+                [Follow(from_user_id=pk, to_user=self) for pk in new_ids],
+                ignore_conflicts=True,
+            )
+            self._adjust_bulk_follow_counts(new_ids, 1)
+            follow_created.send(sender=User, follower=self, targets=[targets[pk] for pk in new_ids])
+        return set(new_ids)
+
+    def unfollow_many(self, targets):
+        """
+        Unfollow every account in `targets` with one existence query and one
+        bulk delete. Returns the ids of the accounts actually unfollowed.
+        """
+        Follow = User.followers.through
+        targets = {target.pk: target for target in targets if target.pk != self.pk}
+        with transaction.atomic():
+            # See follow_many: the locks keep removed_ids exact
+            _lock_users([self.pk, *targets])
+            edges = Follow.objects.filter(to_user=self, from_user__in=targets)
+            removed_ids = list(edges.values_list('from_user_id', flat=True))
+            if not removed_ids:
+                return set()
+            Follow.objects.filter(to_user=self, from_user__in=removed_ids).delete()
+            self._adjust_bulk_follow_counts(removed_ids, -1)
+            follow_removed.send(sender=User, follower=self, targets=[targets[pk] for pk in removed_ids])
+        return set(removed_ids)
+
+    def _adjust_bulk_follow_counts(self, target_ids, delta):
+        Follow = User.followers.through
+        User.objects.filter(pk__in=target_ids).update(follower_count=F('follower_count') + delta)
+        # Recount our own side exactly; cheap with the (to_user, from_user) index
+        self.following_count = Follow.objects.filter(to_user=self).count()
+        User.objects.filter(pk=self.pk).update(following_count=self.following_count)
+
+    def _adjust_follow_counts(self, follower, delta):
+        # F() expressions keep concurrent updates from overwriting each other
+        User.objects.filter(pk=self.pk).update(follower_count=F('follower_count') + delta)
+        User.objects.filter(pk=follower.pk).update(following_count=F('following_count') + delta)
+        self.follower_count += delta
+        follower.following_count += delta
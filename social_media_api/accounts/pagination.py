@@ -0,0 +1,16 @@
+from rest_framework.pagination import CursorPagination
+
+
+class FollowCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the followers through table. Pages are ordered by
+    the listed user's id, which is unique per target and covered by the
+    through table's composite indexes, so every page is an index range scan
+    no matter how deep the cursor is.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def get_ordering(self, request, queryset, view):
+        return (f'{view.user_field}_id',)
@@ -5,11 +5,72 @@ from django.contrib.auth.password_validation import validate_password
 
 User = get_user_model()
 
+class ThumbnailsField(serializers.ReadOnlyField):
+  """
+  Maps the stored thumbnail names to URLs: {"48": url, "128": url, ...}.
+  """
+  def to_representation(self, value):
+    storage = User._meta.get_field('profile_picture').storage
+    return {size: storage.url(name) for size, name in (value or {}).items()}
+
+class AvatarField(serializers.ReadOnlyField):
+  """
+  URL of the smallest thumbnail, falling back to the original upload while
+  the thumbnails are still being rendered.
+  """
+  size = '48'
+
+  def __init__(self, **kwargs):
+    kwargs['source'] = '*'
+    super().__init__(**kwargs)
+
+  def to_representation(self, user):
+    name = (user.profile_picture_thumbnails or {}).get(self.size)
+    if name:
+      return User._meta.get_field('profile_picture').storage.url(name)
+    return user.profile_picture.url if user.profile_picture else None
+
 class UserSerializer(serializers.ModelSerializer):
+  """
+  Pass `compact=True` to return only the follower/following counts instead
+  of the full ID lists, which grow with the size of the account.
+  """
+  profile_picture_thumbnails = ThumbnailsField()
+
   class Meta:
     model = User
-    fields = ['id', 'username', 'email', 'first_name', 'last_name', 'bio', 'profile_picture', 'followers', 'following']
-    read_only_fields = ['followers', 'following']
+    fields = ['id', 'username', 'email', 'first_name', 'last_name', 'bio', 'profile_picture',
+              'profile_picture_thumbnails', 'followers', 'following', 'follower_count', 'following_count']
+    read_only_fields = ['followers', 'following', 'follower_count', 'following_count']
+
+  def __init__(self, *args, compact=False, **kwargs):
+    super().__init__(*args, **kwargs)
+    if compact:
+      self.fields.pop('followers')
+      self.fields.pop('following')
+
+class UserSummarySerializer(serializers.ModelSerializer):
+  """
+  Minimal user representation for followers/following listings; `avatar`
+  is the 48px thumbnail.
+  """
+  avatar = AvatarField()
+
+  class Meta:
+    model = User
+    fields = ['id', 'username', 'avatar']
+    read_only_fields = fields
+
+class SuggestionSerializer(UserSummarySerializer):
+  mutual_count = serializers.IntegerField(read_only=True)
+
+  class Meta(UserSummarySerializer.Meta):
+    fields = UserSummarySerializer.Meta.fields + ['mutual_count']
+    read_only_fields = fields
+
+class BulkFollowSerializer(serializers.Serializer):
+  usernames = serializers.ListField(child=serializers.CharField(), allow_empty=False, max_length=500)
+  action = serializers.ChoiceField(choices=['follow', 'unfollow'], default='follow')
 
 class RegisterSerializer(serializers.ModelSerializer):
   password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
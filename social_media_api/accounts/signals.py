@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+# Sent with `follower` and `targets` (the accounts being followed or
+# unfollowed) whenever follow edges are actually created or removed.
+# The User follow helpers write the through table directly, so m2m_changed
+# does not fire for them. Bulk operations send one signal per batch.
+follow_created = Signal()
+follow_removed = Signal()
@@ -0,0 +1,116 @@
+"""
+"People you may know" suggestions over the follow graph.
+
+Candidates are the accounts followed by the accounts a user follows (two
+hops out), scored by how many of the user's follows also follow them. The
+scoring is one GROUP BY over the followers through table, seeded with the
+user's FOLLOW_SUGGESTIONS_SEED_LIMIT most recent follows so heavy
+followers stay cheap. Scores are cached per user and updated in place when
+that user follows someone; an unfollow drops the cached entry. Both happen
+once the follow transaction commits, so a rolled-back follow never reaches
+the cache. Changes made by *other* users reach the cache when it expires.
+The default cache is per-process, so a follow made through another worker
+may not reach this worker's copy: reads drop already-followed candidates
+with one lookup against the through table.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count
+from django.dispatch import receiver
+
+from .models import User
+from .signals import follow_created, follow_removed
+
+Follow = User.followers.through
+
+CACHE_ALIAS = getattr(settings, 'FOLLOW_SUGGESTIONS_CACHE_ALIAS', 'default')
+CACHE_TTL = getattr(settings, 'FOLLOW_SUGGESTIONS_TTL', 60 * 60)
+SEED_LIMIT = getattr(settings, 'FOLLOW_SUGGESTIONS_SEED_LIMIT', 1_000)
+# Scores kept per user; more than any page so follow updates rarely starve it
+KEEP = getattr(settings, 'FOLLOW_SUGGESTIONS_KEEP', 200)
+
+
+def _cache_key(user_pk):
+    return f'follow-suggestions:{user_pk}'
+
+def _following_ids(user_pk, limit=None):
+    ids = Follow.objects.filter(to_user_id=user_pk).order_by('-id').values_list('from_user_id', flat=True)
+    return list(ids[:limit] if limit else ids)
+
+def _top(scores):
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    return dict(ranked[:KEEP])
+
+def _two_hop_scores(user_pk, seed_ids):
+    """
+    {candidate id: mutual count} for accounts followed by `seed_ids`.
+    """
+    if not seed_ids:
+        return {}
+    rows = (
+        Follow.objects
+        .filter(to_user_id__in=seed_ids)
+        .exclude(from_user_id=user_pk)
+        .values_list('from_user_id')
+        .annotate(mutual=Count('to_user_id'))
+    )
+    return dict(rows)
+
+def compute_suggestions(user_pk):
+    seeds = _following_ids(user_pk, SEED_LIMIT)
+    scores = _two_hop_scores(user_pk, seeds)
+    already = set(_following_ids(user_pk)) if len(seeds) == SEED_LIMIT else set(seeds)
+    return _top({pk: score for pk, score in scores.items() if pk not in already})
+
+def get_suggestion_scores(user_pk):
+    """
+    Cached {candidate id: mutual count}, best first.
+    """
+    cache = caches[CACHE_ALIAS]
+    scores = cache.get(_cache_key(user_pk))
+    if scores is None:
+        scores = compute_suggestions(user_pk)
+        cache.set(_cache_key(user_pk), scores, CACHE_TTL)
+    return scores
+
+def get_suggestions(user, limit=20):
+    """
+    Up to `limit` (User, mutual count) pairs for `user`.
+    """
+    scores = get_suggestion_scores(user.pk)
+    followed = set(
+        Follow.objects.filter(to_user_id=user.pk, from_user_id__in=list(scores)).values_list('from_user_id', flat=True)
+    )
+    top = [(pk, score) for pk, score in scores.items() if pk not in followed][:limit]
+    users = User.objects.in_bulk([pk for pk, _ in top])
+    return [(users[pk], score) for pk, score in top if pk in users]
+
+
+@receiver(follow_created)
+def update_on_follow(sender, follower, targets, **kwargs):
+    target_ids = [target.pk for target in targets]
+    transaction.on_commit(lambda: _add_follows(follower.pk, target_ids))
+
+def _add_follows(follower_pk, target_ids):
+    cache = caches[CACHE_ALIAS]
+    scores = cache.get(_cache_key(follower_pk))
+    if scores is None:
+        return
+    for pk in target_ids:
+        scores.pop(pk, None)
+    # The new follows add one hop: whoever they follow gains a mutual
+    added = _two_hop_scores(follower_pk, target_ids)
+    if added:
+        followed = set(
+            Follow.objects.filter(to_user_id=follower_pk, from_user_id__in=added).values_list('from_user_id', flat=True)
+        )
+        for pk, mutual in added.items():
+            if pk not in followed:
+                scores[pk] = scores.get(pk, 0) + mutual
+    cache.set(_cache_key(follower_pk), _top(scores), CACHE_TTL)
+
+@receiver(follow_removed)
+def drop_on_unfollow(sender, follower, targets, **kwargs):
+    key = _cache_key(follower.pk)
+    transaction.on_commit(lambda: caches[CACHE_ALIAS].delete(key))
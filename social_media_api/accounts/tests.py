@@ -1,3 +1,489 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from . import suggestions, thumbnails
+from .authentication import TokenCache, token_cache
+from .views import AsyncLoginView
 
 # Create your tests here.
+User = get_user_model()
+
+class AuthQueryCountTests(APITestCase):
+    """
+    Lock in the number of queries the registration and login flows run.
+    A regression here means an extra round-trip on every sign-up/login.
+    """
+    password = 'correct-horse-battery'
+
+    def test_register_queries(self):
+        payload = {
+            'username': 'alice',
+            'email': 'alice@example.com',
+            'password': self.password,
+            'password2': self.password,
+        }
+        # username uniqueness check, savepoint, user insert, token insert,
+        # savepoint release
+        with self.assertNumQueries(5):
+            response = self.client.post(reverse('register'), payload)
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(username='alice')
+        self.assertEqual(response.data['token'], Token.objects.get(user=user).key)
+        self.assertEqual(response.data['user']['username'], 'alice')
+
+    def test_login_queries(self):
+        user = User.objects.create_user('bob', password=self.password)
+        token = Token.objects.create(user=user)
+        # user lookup, token lookup
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                reverse('login') + '?compact=1',
+                {'username': 'bob', 'password': self.password},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['token'], token.key)
+        self.assertEqual(response.data['user']['username'], 'bob')
+
+    def test_login_creates_missing_token(self):
+        User.objects.create_user('carol', password=self.password)
+        response = self.client.post(reverse('login'), {'username': 'carol', 'password': self.password})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['token'], Token.objects.get(user__username='carol').key)
+
+class BulkFollowTests(APITestCase):
+    """
+    follow_many / unfollow_many and the bulk-follow endpoint: per-username
+    outcomes and counters that move by exactly the edges written.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('me', password='pw')
+        self.others = [User.objects.create_user(f'u{i}', password='pw') for i in range(4)]
+        self.client.force_authenticate(self.user)
+
+    def counts(self, user):
+        user.refresh_from_db()
+        return user.follower_count, user.following_count
+
+    def bulk(self, usernames, action='follow'):
+        return self.client.post(reverse('bulk-follow'), {'usernames': usernames, 'action': action}, format='json')
+
+    def test_partial_overlap(self):
+        a, b, c, _ = self.others
+        a.add_follower(self.user)
+        response = self.bulk(['u0', 'u1', 'u2', 'nobody', 'u1'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], {
+            'u0': 'already_following', 'u1': 'followed', 'u2': 'followed', 'nobody': 'not_found',
+        })
+        self.assertEqual(self.counts(self.user), (0, 3))
+        self.assertEqual([self.counts(u) for u in (a, b, c)], [(1, 0)] * 3)
+
+        response = self.bulk(['u1', 'u3'], action='unfollow')
+        self.assertEqual(response.data['results'], {'u1': 'unfollowed', 'u3': 'not_following'})
+        self.assertEqual(self.counts(self.user), (0, 2))
+        self.assertEqual(self.counts(b), (0, 0))
+
+    def test_self_target_is_ignored(self):
+        response = self.bulk(['me', 'u0'])
+        self.assertEqual(response.data['results'], {'me': 'self', 'u0': 'followed'})
+        self.assertEqual(self.counts(self.user), (0, 1))
+        self.assertFalse(self.user.following.filter(pk=self.user.pk).exists())
+
+        response = self.bulk(['me'], action='unfollow')
+        self.assertEqual(response.data['results'], {'me': 'self'})
+        self.assertEqual(self.counts(self.user), (0, 1))
+
+    def test_repeated_calls_do_not_drift(self):
+        self.assertEqual(self.user.follow_many(self.others), {u.pk for u in self.others})
+        self.assertEqual(self.user.follow_many(self.others), set())
+        self.assertEqual(self.counts(self.user), (0, 4))
+        self.assertEqual(self.user.unfollow_many(self.others), {u.pk for u in self.others})
+        self.assertEqual(self.user.unfollow_many(self.others), set())
+        self.assertEqual(self.counts(self.user), (0, 0))
+        self.assertEqual([self.counts(u) for u in self.others], [(0, 0)] * 4)
+
+    def test_too_many_usernames(self):
+        response = self.bulk([f'x{i}' for i in range(501)])
+        self.assertEqual(response.status_code, 400)
+
+class TokenCacheTests(APITestCase):
+    """
+    Token -> user resolution is cached, and revoking a token or disabling
+    its user takes effect on the next request.
+    """
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def profile_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('profile'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def shared_tier(self):
+        # 'default' is LocMem here: shared only because the test is one process
+        patcher = mock.patch.object(token_cache, 'cache_alias', 'default')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_no_shared_tier_by_default(self):
+        # settings' default cache is per-process LocMem
+        self.assertIsNone(token_cache.shared)
+
+    def test_hits_skip_the_token_query(self):
+        cold = self.profile_queries()
+        self.assertEqual(self.profile_queries(), cold - 1)
+        # Without a shared tier a fresh worker goes back to the database
+        token_cache.clear()
+        self.assertEqual(self.profile_queries(), cold)
+
+    def test_fresh_worker_is_served_from_shared_tier(self):
+        self.shared_tier()
+        cold = self.profile_queries()
+        token_cache.clear()
+        self.assertEqual(self.profile_queries(), cold - 1)
+
+    def test_logout_revokes_token(self):
+        self.profile_queries()
+        response = self.client.post(reverse('logout'))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 401)
+
+    def test_logout_reaches_other_workers_through_shared_cache(self):
+        self.shared_tier()
+        other_worker = TokenCache(local_ttl=0, cache_alias='default')
+        self.profile_queries()
+        self.assertIsNotNone(other_worker.get(self.token.key))
+        self.client.post(reverse('logout'))
+        self.assertIsNone(other_worker.get(self.token.key))
+
+    def test_inactive_user_is_rejected(self):
+        self.profile_queries()
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(response.status_code, 401)
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    def test_regenerated_token_replaces_old_key(self):
+        self.profile_queries()
+        self.token.delete()
+        new = Token.objects.create(user=self.user)
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 401)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {new.key}')
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 200)
+
+class AsyncLoginTests(TestCase):
+    """
+    AsyncLoginView authenticates through AUTHENTICATION_BACKENDS and
+    answers malformed bodies with 400, never 500.
+    """
+    password = 'correct-horse-battery'
+
+    def setUp(self):
+        self.user = User.objects.create_user('bob', password=self.password)
+
+    async def login(self, body, content_type='application/json'):
+        if not isinstance(body, (str, bytes)):
+            body = json.dumps(body)
+        request = AsyncRequestFactory().post(reverse('login'), body, content_type=content_type)
+        response = await AsyncLoginView.as_view()(request)
+        return response.status_code, json.loads(response.content)
+
+    async def test_valid_credentials_return_token(self):
+        status, data = await self.login({'username': 'bob', 'password': self.password})
+        self.assertEqual(status, 200)
+        self.assertEqual(data['token'], (await Token.objects.aget(user=self.user)).key)
+        self.assertEqual(data['user']['username'], 'bob')
+
+    async def test_bad_credentials(self):
+        for credentials in ({'username': 'bob', 'password': 'wrong'}, {'username': 'nobody', 'password': 'x'}):
+            status, data = await self.login(credentials)
+            self.assertEqual(status, 400)
+            self.assertIn('non_field_errors', data)
+
+    async def test_inactive_user_is_rejected(self):
+        self.user.is_active = False
+        await self.user.asave()
+        status, _ = await self.login({'username': 'bob', 'password': self.password})
+        self.assertEqual(status, 400)
+
+    async def test_malformed_bodies(self):
+        for body in ('[1, 2]', '"bob"', 'null', '{not json', {'username': 'bob'}, {'username': ['bob'], 'password': 'x'}):
+            status, _ = await self.login(body)
+            self.assertEqual(status, 400, body)
+
+    @override_settings(AUTHENTICATION_BACKENDS=['django.contrib.auth.backends.AllowAllUsersModelBackend'])
+    async def test_configured_backends_are_used(self):
+        self.user.is_active = False
+        await self.user.asave()
+        status, _ = await self.login({'username': 'bob', 'password': self.password})
+        self.assertEqual(status, 200)
+
+class PasswordHasherBenchTests(TestCase):
+
+    def test_bench_password_hashers_runs(self):
+        stdout = StringIO()
+        call_command('bench_password_hashers', rounds=1, workers=1, stdout=stdout)
+        output = stdout.getvalue()
+        for profile in ('pbkdf2', 'scrypt', 'argon2'):
+            self.assertIn(profile, output)
+
+class SuggestionsTests(APITestCase):
+    """
+    Two-hop suggestions, their cache (only touched once a follow commits)
+    and the endpoint's limit handling.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.me = User.objects.create_user('me', password='pw')
+        self.a, self.b, self.c, self.d = [User.objects.create_user(name, password='pw') for name in 'abcd']
+        # me -> a, b; a -> c, d; b -> c
+        for follower, target in ((self.me, self.a), (self.me, self.b), (self.a, self.c), (self.a, self.d), (self.b, self.c)):
+            target.add_follower(follower)
+        self.client.force_authenticate(self.me)
+
+    def suggested(self, **params):
+        response = self.client.get(reverse('follow-suggestions'), params)
+        self.assertEqual(response.status_code, 200)
+        return [(row['username'], row['mutual_count']) for row in response.data]
+
+    def cached(self):
+        return cache.get(suggestions._cache_key(self.me.pk))
+
+    def test_ranked_by_mutual_count(self):
+        self.assertEqual(self.suggested(), [('c', 2), ('d', 1)])
+        self.assertEqual(self.suggested(limit=1), [('c', 2)])
+
+    def test_cache_updated_after_commit(self):
+        self.suggested()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.c.add_follower(self.me)
+            # Not before the follow commits
+            self.assertIn(self.c.pk, self.cached())
+        self.assertEqual(self.cached(), {self.d.pk: 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.c.remove_follower(self.me)
+            self.assertIsNotNone(self.cached())
+        self.assertIsNone(self.cached())
+
+    def test_follow_missed_by_cache_is_not_suggested(self):
+        self.suggested()
+        # The on_commit update never runs: as if the follow went through a
+        # worker with its own cache
+        self.c.add_follower(self.me)
+        self.assertIn(self.c.pk, self.cached())
+        self.assertEqual(self.suggested(), [('d', 1)])
+
+    def test_rolled_back_follow_leaves_cache_alone(self):
+        self.suggested()
+        before = self.cached()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.c.add_follower(self.me)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.cached(), before)
+
+    def test_limit_bounds(self):
+        url = reverse('follow-suggestions')
+        for limit in ('0', '-1', 'x'):
+            self.assertEqual(self.client.get(url, {'limit': limit}).status_code, 400, limit)
+        self.assertEqual(len(self.suggested(limit=10_000)), 2)
+
+class ThumbnailTests(APITestCase):
+    """
+    A new profile picture is rendered into square variants in the
+    configured format, off the request, and the serializer links them.
+    """
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user('alice', password='pw')
+
+    def upload(self, size=(300, 200), fmt='PNG', mode='RGB'):
+        buffer = BytesIO()
+        Image.new(mode, size, 'red').save(buffer, fmt)
+        return SimpleUploadedFile(f'pic.{fmt.lower()}', buffer.getvalue())
+
+    def test_render_thumbnails_sizes_and_format(self):
+        self.user.profile_picture = self.upload(mode='RGBA')
+        self.user.save()
+        names = thumbnails.render_thumbnails(self.user.profile_picture)
+        self.assertEqual(list(names), [str(size) for size in thumbnails.SIZES])
+        storage = self.user.profile_picture.storage
+        for size, name in names.items():
+            self.assertTrue(name.endswith(f'_{size}.{thumbnails.FORMAT.lower()}'))
+            with storage.open(name) as fh:
+                image = Image.open(fh)
+                self.assertEqual(image.format, thumbnails.FORMAT)
+                self.assertEqual(image.size, (int(size), int(size)))
+
+    def test_new_picture_queues_thumbnails_after_commit(self):
+        with mock.patch.object(thumbnails._executor, 'submit') as submit:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.profile_picture = self.upload()
+                self.user.save()
+                submit.assert_not_called()
+            submit.assert_called_once_with(thumbnails.build_user_thumbnails, self.user.pk)
+            # Saving without a new upload doesn't render again
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.bio = 'hi'
+                self.user.save()
+            submit.assert_called_once()
+
+    def test_build_records_thumbnails_for_serializer(self):
+        self.user.profile_picture = self.upload()
+        self.user.save()
+        # The job closes its thread's connection; here that is the test's
+        with mock.patch.object(thumbnails, 'connection'):
+            thumbnails.build_user_thumbnails(self.user.pk)
+        self.user.refresh_from_db()
+        self.assertEqual(set(self.user.profile_picture_thumbnails), {str(size) for size in thumbnails.SIZES})
+        self.client.force_authenticate(self.user)
+        data = self.client.get(reverse('profile')).data
+        self.assertEqual(
+            data['profile_picture_thumbnails']['48'],
+            self.user.profile_picture.storage.url(self.user.profile_picture_thumbnails['48']),
+        )
+
+class FollowCounterTests(APITestCase):
+    """
+    follower_count/following_count move with every follow write and
+    always match the through table.
+    """
+
+    def setUp(self):
+        self.alice, self.bob, self.carol = [
+            User.objects.create_user(name, password='pw') for name in ('alice', 'bob', 'carol')
+        ]
+
+    def assert_counts(self):
+        Follow = User.followers.through
+        for user in User.objects.all():
+            # from_user is the followed account, to_user the follower
+            self.assertEqual(
+                (user.follower_count, user.following_count),
+                (Follow.objects.filter(from_user=user).count(), Follow.objects.filter(to_user=user).count()),
+                user.username,
+            )
+
+    def test_follow_unfollow_and_repeats(self):
+        self.assertTrue(self.alice.add_follower(self.bob))
+        self.assertFalse(self.alice.add_follower(self.bob))
+        self.assertTrue(self.alice.add_follower(self.carol))
+        self.assertTrue(self.carol.add_follower(self.bob))
+        self.assert_counts()
+        self.assertEqual(User.objects.get(pk=self.alice.pk).follower_count, 2)
+        self.assertEqual(User.objects.get(pk=self.bob.pk).following_count, 2)
+
+        self.assertTrue(self.alice.remove_follower(self.bob))
+        self.assertFalse(self.alice.remove_follower(self.bob))
+        self.assert_counts()
+
+    def test_toggle_endpoint(self):
+        self.client.force_authenticate(self.bob)
+        url = reverse('follow-toggle', args=['alice'])
+        self.assertEqual(self.client.post(url).data['detail'], 'followed alice')
+        self.assert_counts()
+        self.assertEqual(self.client.post(url).data['detail'], 'unfollowed alice')
+        self.assert_counts()
+        self.assertEqual(User.objects.get(pk=self.alice.pk).follower_count, 0)
+        self.assertEqual(self.client.post(reverse('follow-toggle', args=['bob'])).status_code, 400)
+        self.assertEqual(self.client.post(reverse('follow-toggle', args=['nobody'])).status_code, 404)
+
+    def test_counts_in_profile(self):
+        self.alice.add_follower(self.bob)
+        self.client.force_authenticate(self.alice)
+        data = self.client.get(reverse('profile'), {'compact': 1}).data
+        self.assertEqual((data['follower_count'], data['following_count']), (1, 0))
+
+    def test_admin_cannot_edit_followers(self):
+        request = RequestFactory().get('/')
+        request.user = User.objects.create_superuser('root', password='pw')
+        form = admin.site._registry[User].get_form(request, self.alice)
+        self.assertNotIn('followers', form.base_fields)
+
+class FollowListPaginationTests(APITestCase):
+    """
+    Followers/following listings page by the listed user's id: a stable
+    order that new follows can't shift under an open cursor.
+    """
+
+    def setUp(self):
+        self.star = User.objects.create_user('star', password='pw')
+        self.fans = [User.objects.create_user(f'fan{i:02}', password='pw') for i in range(12)]
+        # Follow in shuffled order; pages must still come out by id
+        for fan in self.fans[::2] + self.fans[1::2]:
+            self.star.add_follower(fan)
+            fan.add_follower(self.star)
+
+    def walk(self, url, page_size=5, during=None):
+        usernames, params = [], {'page_size': page_size}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            usernames += [row['username'] for row in response.data['results']]
+            url, params = response.data['next'], None
+            if during:
+                during()
+                during = None
+        return usernames
+
+    def test_followers_and_following_in_id_order(self):
+        expected = [fan.username for fan in self.fans]
+        self.assertEqual(self.walk(reverse('followers-list', args=['star'])), expected)
+        self.assertEqual(self.walk(reverse('following-list', args=['star'])), expected)
+
+    def test_cursor_is_stable_under_new_follows(self):
+        newcomer = User.objects.create_user('newcomer', password='pw')
+        early = self.fans[0]
+        self.star.remove_follower(early)
+        seen = self.walk(
+            reverse('followers-list', args=['star']),
+            during=lambda: (self.star.add_follower(newcomer), self.star.add_follower(early)),
+        )
+        # The re-follow lands behind the cursor; nothing repeats or goes missing
+        self.assertEqual(seen, [fan.username for fan in self.fans[1:]] + ['newcomer'])
+
+    def test_page_queries_are_constant(self):
+        url = reverse('followers-list', args=['star'])
+        # target lookup + one page of edges joined with their users
+        with self.assertNumQueries(2):
+            self.client.get(url, {'page_size': 3})
+        with self.assertNumQueries(2):
+            self.client.get(url, {'page_size': 12})
+
+    def test_unknown_user_is_404(self):
+        self.assertEqual(self.client.get(reverse('followers-list', args=['nobody'])).status_code, 404)
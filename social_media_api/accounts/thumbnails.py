@@ -0,0 +1,97 @@
+"""
+Profile picture thumbnails.
+
+When a new profile picture is saved, fixed-size square variants (48, 128
+and 512px by default) are rendered once, off the request thread, and their
+storage names are recorded in User.profile_picture_thumbnails. Clients then
+download the variant they need instead of the original upload.
+render_thumbnails() and delete_thumbnails() are the same code as in
+django_blog's blog.thumbnails: the two projects deploy separately and share
+no package, so a fix to one belongs in both (each has its own tests).
+"""
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from PIL import Image, ImageOps, features
+
+from .authentication import token_cache
+from .models import User
+
+SIZES = getattr(settings, 'PROFILE_THUMBNAIL_SIZES', (48, 128, 512))
+FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'THUMBNAIL_WORKERS', 2),
+    thread_name_prefix='thumbnails',
+)
+
+
+def render_thumbnails(field_file, sizes=SIZES):
+    """
+    Render square `sizes` variants of `field_file` into its storage.
+    Returns {str(size): storage name}.
+    """
+    storage = field_file.storage
+    directory, filename = posixpath.split(field_file.name)
+    stem = posixpath.splitext(filename)[0]
+
+    with field_file.open('rb') as fh:
+        image = ImageOps.exif_transpose(Image.open(fh))
+        image.load()
+    image = image.convert('RGBA' if FORMAT == 'WEBP' and 'A' in image.getbands() else 'RGB')
+
+    names = {}
+    for size in sizes:
+        thumb = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        thumb.save(buffer, FORMAT, quality=80)
+        name = posixpath.join(directory, 'thumbs', f'{stem}_{size}.{FORMAT.lower()}')
+        names[str(size)] = storage.save(name, ContentFile(buffer.getvalue()))
+    return names
+
+def delete_thumbnails(storage, names):
+    for name in names.values():
+        storage.delete(name)
+
+def build_user_thumbnails(user_pk):
+    """
+    Background job: render thumbnails for the user's current picture.
+    """
+    try:
+        user = User.objects.only('pk', 'profile_picture', 'profile_picture_thumbnails').get(pk=user_pk)
+        if not user.profile_picture:
+            return
+        names = render_thumbnails(user.profile_picture)
+        # Only record them if the picture wasn't replaced in the meantime
+        updated = User.objects.filter(pk=user_pk, profile_picture=user.profile_picture.name).update(
+            profile_picture_thumbnails=names,
+        )
+        storage = user.profile_picture.storage
+        delete_thumbnails(storage, user.profile_picture_thumbnails if updated else names)
+        token_cache.invalidate_user(user_pk)
+    except User.DoesNotExist:
+        pass
+    finally:
+        connection.close()
+
+
+@receiver(pre_save, sender=User)
+def mark_new_profile_picture(sender, instance, **kwargs):
+    picture = instance.profile_picture
+    # An uncommitted FieldFile is a fresh upload that save() is about to store
+    instance._thumbnails_pending = bool(picture) and not picture._committed
+    if not picture and instance.profile_picture_thumbnails:
+        delete_thumbnails(picture.storage, instance.profile_picture_thumbnails)
+        instance.profile_picture_thumbnails = {}
+
+@receiver(post_save, sender=User)
+def queue_profile_thumbnails(sender, instance, **kwargs):
+    if getattr(instance, '_thumbnails_pending', False):
+        instance._thumbnails_pending = False
+        transaction.on_commit(lambda: _executor.submit(build_user_thumbnails, instance.pk))
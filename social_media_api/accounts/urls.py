@@ -1,9 +1,21 @@
+from django.conf import settings
 from django.urls import path
-from .views import RegisterView, CustomObtainAuthToken, ProfileView, FollowToggleView
+from .views import (
+    RegisterView, CustomObtainAuthToken, AsyncLoginView, LogoutView, ProfileView,
+    FollowToggleView, BulkFollowView, SuggestionsView, FollowersListView, FollowingListView,
+)
+
+# Under ASGI, verify passwords on the hash pool instead of the sync thread
+login_view = AsyncLoginView if getattr(settings, 'PASSWORD_HASH_OFFLOAD', False) else CustomObtainAuthToken
 
 urlpatterns = [
   path('register/', RegisterView.as_view(), name='register'),
-  path('login/', CustomObtainAuthToken.as_view(), name='login'),
+  path('login/', login_view.as_view(), name='login'),
+  path('logout/', LogoutView.as_view(), name='logout'),
   path('profile/', ProfileView.as_view(), name='profile'),
+  path('suggestions/', SuggestionsView.as_view(), name='follow-suggestions'),
+  path('bulk-follow/', BulkFollowView.as_view(), name='bulk-follow'),
   path('follow/<str:username>/', FollowToggleView.as_view(), name='follow-toggle'),
+  path('<str:username>/followers/', FollowersListView.as_view(), name='followers-list'),
+  path('<str:username>/following/', FollowingListView.as_view(), name='following-list'),
 ]
\ No newline at end of file
@@ -1,40 +1,105 @@
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.decorators import api_view, permission_classes
-from django.contrib.auth import get_user_model
-from .serializers import UserSerializer, RegisterSerializer
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate, get_user_model
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from .pagination import FollowCursorPagination
+from .serializers import (
+    BulkFollowSerializer, UserSerializer, RegisterSerializer, SuggestionSerializer, UserSummarySerializer,
+)
+from .suggestions import get_suggestions
 
 # Create your views here.
 User = get_user_model()
 
+def wants_compact(request):
+    # ?compact=1 swaps the follower/following ID lists for their counts
+    return request.query_params.get('compact', '').lower() in ('1', 'true', 'yes')
+
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = (permissions.AllowAny,)
     serializer_class = RegisterSerializer
 
     def create(self, request, *args, **kwargs):
-        response = super().create(request, *args, **kwargs)
-        # create token and return it with user data
-        user = User.objects.get(username=response.data['username'])
-        token, _ = Token.objects.get_or_create(user=user)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # RegisterSerializer.create also creates the token; keep both
+        # inserts together and read the token off the new user instead of
+        # querying for it again
+        with transaction.atomic():
+            user = serializer.save()
         data = {
-            'user': response.data,
-            'token': token.key,
+            'user': serializer.data,
+            'token': user.auth_token.key,
         }
         return Response(data)
 
 # Option 1: use default ObtainAuthToken but extend to return user info
 class CustomObtainAuthToken(ObtainAuthToken):
     def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
-        token = Token.objects.get(key=response.data['token'])
-        user = token.user
-        user_data = UserSerializer(user).data
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        token, _ = Token.objects.get_or_create(user=user)
+        user_data = UserSerializer(user, compact=wants_compact(request)).data
         return Response({'token': token.key, 'user': user_data})
 
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncLoginView(View):
+    """
+    Async twin of CustomObtainAuthToken for ASGI deployments. Credentials
+    go through aauthenticate(), so AUTHENTICATION_BACKENDS apply as they do
+    for the sync view; accounts.backends.HashPoolModelBackend checks the
+    password on the bounded hash pool from accounts.hashing, off the shared
+    sync thread. Routed to login/ when settings.PASSWORD_HASH_OFFLOAD is on.
+    """
+    error = {'non_field_errors': ['Unable to log in with provided credentials.']}
+
+    async def post(self, request):
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError:
+                return JsonResponse({'detail': 'Invalid JSON.'}, status=400)
+            if not isinstance(data, dict):
+                return JsonResponse({'detail': 'Expected a JSON object.'}, status=400)
+        else:
+            data = request.POST
+        username, password = data.get('username'), data.get('password')
+        if not isinstance(username, str) or not isinstance(password, str) or not username or not password:
+            return JsonResponse({'detail': 'username and password are required.'}, status=400)
+
+        user = await aauthenticate(request, username=username, password=password)
+        if user is None:
+            return JsonResponse(self.error, status=400)
+
+        token, _ = await Token.objects.aget_or_create(user=user)
+        compact = request.GET.get('compact', '').lower() in ('1', 'true', 'yes')
+        user_data = await sync_to_async(lambda: UserSerializer(user, compact=compact).data)()
+        return JsonResponse({'token': token.key, 'user': user_data})
+
+class LogoutView(APIView):
+    """
+    Delete the caller's token; the token cache drops it via post_delete.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        Token.objects.filter(user=request.user).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 # Profile view
 class ProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
@@ -43,8 +108,11 @@ class ProfileView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         return self.request.user
 
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('compact', wants_compact(self.request))
+        return super().get_serializer(*args, **kwargs)
+
 # Follow / unfollow endpoints (simple)
-from rest_framework import status
 
 class FollowToggleView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -59,12 +127,99 @@ class FollowToggleView(APIView):
         if target == user:
             return Response({'detail': "You can't follow yourself."}, status=status.HTTP_400_BAD_REQUEST)
 
-        if user in target.followers.all():
-            # unfollow
-            target.followers.remove(user)
-            action = 'unfollowed'
+        # Single indexed delete-or-insert on the followers through table
+        action = 'followed' if target.toggle_follower(user) else 'unfollowed'
+
+        return Response({'detail': f'{action} {target.username}'})
+
+class BulkFollowView(APIView):
+    """
+    Follow or unfollow up to 500 accounts at once:
+    {"usernames": [...], "action": "follow" | "unfollow"}.
+    Targets are resolved with one IN query and written with one bulk insert
+    or delete; the response reports the outcome per username.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = BulkFollowSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        usernames = list(dict.fromkeys(serializer.validated_data['usernames']))
+        follow = serializer.validated_data['action'] == 'follow'
+
+        user = request.user
+        targets = list(User.objects.filter(username__in=usernames).only('pk', 'username', 'follower_count'))
+        if follow:
+            changed = user.follow_many(targets)
+            done, unchanged = 'followed', 'already_following'
         else:
-            target.followers.add(user)
-            action = 'followed'
+            changed = user.unfollow_many(targets)
+            done, unchanged = 'unfollowed', 'not_following'
+
+        results = dict.fromkeys(usernames, 'not_found')
+        for target in targets:
+            if target.pk == user.pk:
+                results[target.username] = 'self'
+            else:
+                results[target.username] = done if target.pk in changed else unchanged
+        return Response({'results': results})
+
+class SuggestionsView(APIView):
+    """
+    Accounts followed by the people you follow, ranked by mutual count.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            return Response({'detail': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'detail': 'limit must be at least 1.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(limit, self.max_limit)
+        users = []
+        for user, mutual in get_suggestions(request.user, limit):
+            user.mutual_count = mutual
+            users.append(user)
+        return Response(SuggestionSerializer(users, many=True).data)
+
+# Followers / following listings (cursor paginated)
+class FollowListView(generics.ListAPIView):
+    """
+    Pages through one side of the followers through table. Subclasses set
+    `target_field` (the column matching the profile being listed) and
+    `user_field` (the column holding the users to return).
+    """
+    serializer_class = UserSummarySerializer
+    pagination_class = FollowCursorPagination
+    target_field = None
+    user_field = None
+
+    def get_queryset(self):
+        target = get_object_or_404(User.objects.only('pk'), username=self.kwargs['username'])
+        Follow = User.followers.through
+        user = self.user_field
+        return (
+            Follow.objects
+            .filter(**{self.target_field: target})
+            .select_related(user)
+            .only(f'{user}__id', f'{user}__username', f'{user}__profile_picture',
+                  f'{user}__profile_picture_thumbnails')
+        )
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        users = [getattr(edge, self.user_field) for edge in page]
+        serializer = self.get_serializer(users, many=True)
+        return self.get_paginated_response(serializer.data)
+
+class FollowersListView(FollowListView):
+    target_field = 'from_user'
+    user_field = 'to_user'
 
-        return Response({'detail': f'{action} {target.username}'})
\ No newline at end of file
+class FollowingListView(FollowListView):
+    target_field = 'to_user'
+    user_field = 'from_user'
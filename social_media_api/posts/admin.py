@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import Post
+
+# Register your models here.
+@admin.register(Post)
+class PostAdmin(admin.ModelAdmin):
+  list_display = ('title', 'author', 'created_at')
+  search_fields = ('title', 'author__username')
+  raw_id_fields = ('author',)
@@ -0,0 +1,96 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+
+from posts import timeline
+from posts.models import Post
+
+User = get_user_model()
+Follow = User.followers.through
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark home timeline reads (fan-out-on-write with celebrity "
+        "fan-out-on-read vs. a plain JOIN over the follow graph) at several "
+        "follow-graph sizes. Runs in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--edges', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+        parser.add_argument('--posts-per-user', type=int, default=2)
+        parser.add_argument('--reads', type=int, default=200, help='Feed reads timed per graph size.')
+        parser.add_argument('--limit', type=int, default=20, help='Feed page size.')
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.stdout.write(f"{'edges':>10} {'users':>7} {'fan-out p50':>12} {'fan-out p95':>12} "
+                              f"{'join p50':>10} {'join p95':>10}")
+            for edges in options['edges']:
+                self.run_size(edges, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run_size(self, edges, options):
+        Post.objects.all().delete()
+        User.objects.all().delete()
+
+        # ~100 follows per user on large graphs, denser on small ones. User 1
+        # is a celebrity followed by everyone and read through fan-out-on-read.
+        per_user = max(1, min(100, int(edges ** 0.5)))
+        user_count = max(per_user + 1, edges // per_user)
+        self.build_graph(user_count, per_user)
+        timeline.FANOUT_THRESHOLD = user_count // 2
+        self.build_posts(options['posts_per_user'])
+
+        readers = random.sample(range(2, user_count + 1), min(options['reads'], user_count - 1))
+        limit = options['limit']
+        fanout = self.time_reads(readers, lambda user: timeline.get_home_timeline(user, limit))
+        join = self.time_reads(readers, lambda user: list(
+            Post.objects.filter(author__followers=user).select_related('author').order_by('-id')[:limit]
+        ))
+        self.stdout.write(f'{Follow.objects.count():>10} {user_count:>7} {fanout[0]:>10.2f}ms '
+                          f'{fanout[1]:>10.2f}ms {join[0]:>8.2f}ms {join[1]:>8.2f}ms')
+
+    def build_graph(self, user_count, per_user):
+        ids = range(1, user_count + 1)
+        User.objects.bulk_create([User(id=i, username=f'bench{i}') for i in ids], batch_size=5_000)
+
+        follows = []
+        for follower in ids:
+            targets = set(random.sample(ids, per_user)) | {1}
+            targets.discard(follower)
+            follows += [Follow(from_user_id=target, to_user_id=follower) for target in targets]
+            if len(follows) >= 50_000:
+                Follow.objects.bulk_create(follows, ignore_conflicts=True)
+                follows = []
+        Follow.objects.bulk_create(follows, ignore_conflicts=True)
+
+        counts = Follow.objects.values_list('from_user').annotate(n=Count('pk'))
+        for user_id, count in counts.iterator():
+            User.objects.filter(pk=user_id).update(follower_count=count)
+
+    def build_posts(self, posts_per_user):
+        # bulk_create skips post_save, so fan out explicitly like the API would
+        authors = User.objects.only('pk', 'follower_count')
+        for author in authors.iterator(chunk_size=1_000):
+            posts = Post.objects.bulk_create(
+                [Post(author=author, title=f'{author.pk}-{n}', content='x') for n in range(posts_per_user)]
+            )
+            for post in posts:
+                timeline.fan_out_post(post)
+
+    def time_reads(self, readers, read):
+        samples = []
+        for reader in readers:
+            start = time.perf_counter()
+            read(User(pk=reader))
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
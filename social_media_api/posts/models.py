@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import models
+
+# Create your models here.
+
+class Post(models.Model):
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='posts')
+    title = models.CharField(max_length=200)
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            # fan-out-on-read: latest posts of a handful of popular authors
+            models.Index(fields=['author', '-id'], name='post_author_id_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+class TimelineEntry(models.Model):
+    """
+    One post materialized into one user's home timeline (fan-out-on-write).
+    `author` is copied from the post so unfollowing can drop an author's
+    entries without joining back to Post.
+    """
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='timeline_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='timeline_entries')
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        constraints = [
+            # Also the read index: a timeline page is a backwards range scan
+            models.UniqueConstraint(fields=['owner', 'post'], name='timeline_owner_post_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['owner', 'author'], name='timeline_owner_author_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.owner_id} <- {self.post_id}'
@@ -0,0 +1,10 @@
+from rest_framework import serializers
+from .models import Post
+
+class PostSerializer(serializers.ModelSerializer):
+  author = serializers.ReadOnlyField(source='author.username')
+
+  class Meta:
+    model = Post
+    fields = ['id', 'author', 'title', 'content', 'created_at', 'updated_at']
+    read_only_fields = ['id', 'author', 'created_at', 'updated_at']
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from accounts.signals import follow_created, follow_removed
+from . import timeline
+from .models import Post
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: timeline.fan_out_post(instance))
+
+@receiver(follow_created)
+def backfill_on_follow(sender, follower, targets, **kwargs):
+    timeline.backfill_timeline(follower, targets)
+
+@receiver(follow_removed)
+def purge_on_unfollow(sender, follower, targets, **kwargs):
+    timeline.purge_timeline(follower, targets)
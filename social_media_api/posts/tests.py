@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from . import timeline
+from .models import Post, TimelineEntry
+
+User = get_user_model()
+
+class TimelineTests(APITestCase):
+    """
+    Fan-out-on-write timelines: posts land in followers' timelines when
+    written, follows backfill and unfollows purge, and the feed pages with
+    a post id cursor.
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user('alice', password='pw')
+        self.bob = User.objects.create_user('bob', password='pw')
+        self.carol = User.objects.create_user('carol', password='pw')
+
+    def post(self, author, title='hello'):
+        # Fan-out runs on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            return Post.objects.create(author=author, title=title, content='...')
+
+    def timeline_posts(self, user):
+        return set(TimelineEntry.objects.filter(owner=user).values_list('post_id', flat=True))
+
+    def test_post_is_fanned_out_to_author_and_followers(self):
+        self.alice.add_follower(self.bob)
+        post = self.post(self.alice)
+        self.assertIn(post.pk, self.timeline_posts(self.alice))
+        self.assertIn(post.pk, self.timeline_posts(self.bob))
+        self.assertNotIn(post.pk, self.timeline_posts(self.carol))
+
+    def test_follow_backfills_and_unfollow_purges(self):
+        posts = [self.post(self.alice, f'p{i}') for i in range(3)]
+        self.alice.add_follower(self.bob)
+        self.assertEqual(self.timeline_posts(self.bob), {post.pk for post in posts})
+
+        self.alice.remove_follower(self.bob)
+        self.assertEqual(self.timeline_posts(self.bob), set())
+
+    def test_follow_many_backfills_each_target(self):
+        a = self.post(self.alice)
+        c = self.post(self.carol)
+        self.bob.follow_many([self.alice, self.carol])
+        self.assertEqual(self.timeline_posts(self.bob), {a.pk, c.pk})
+        self.bob.unfollow_many([self.alice])
+        self.assertEqual(self.timeline_posts(self.bob), {c.pk})
+
+    def test_popular_authors_are_pulled_at_read_time(self):
+        self.alice.add_follower(self.bob)
+        self.addCleanup(setattr, timeline, 'FANOUT_THRESHOLD', timeline.FANOUT_THRESHOLD)
+        timeline.FANOUT_THRESHOLD = 0
+        post = self.post(self.alice)
+        self.assertNotIn(post.pk, self.timeline_posts(self.bob))
+        self.assertEqual(timeline.get_home_timeline(self.bob), [post])
+
+    def test_feed_pages_with_before_cursor(self):
+        self.alice.add_follower(self.bob)
+        posts = [self.post(self.alice, f'p{i}') for i in range(5)]
+        self.client.force_authenticate(self.bob)
+
+        response = self.client.get(reverse('feed'), {'limit': 2})
+        self.assertEqual([p['id'] for p in response.data['results']], [posts[4].pk, posts[3].pk])
+        self.assertEqual(response.data['next_before'], posts[3].pk)
+
+        seen = [p['id'] for p in response.data['results']]
+        while response.data['next_before']:
+            response = self.client.get(reverse('feed'), {'limit': 2, 'before': response.data['next_before']})
+            seen += [p['id'] for p in response.data['results']]
+        self.assertEqual(seen, [post.pk for post in reversed(posts)])
+
+    def test_feed_limit_bounds(self):
+        self.client.force_authenticate(self.bob)
+        for limit in ('0', '-1', 'x'):
+            response = self.client.get(reverse('feed'), {'limit': limit})
+            self.assertEqual(response.status_code, 400, limit)
+        self.post(self.bob)
+        response = self.client.get(reverse('feed'), {'limit': 10_000})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
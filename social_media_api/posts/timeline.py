@@ -0,0 +1,94 @@
+"""
+Home timeline storage.
+
+Posts are pushed into per-follower TimelineEntry rows when they are
+written (fan-out-on-write), so reading a feed is a single index range scan
+instead of a JOIN over the follow graph. Accounts with more followers than
+TIMELINE_FANOUT_THRESHOLD are not fanned out; their posts are pulled in at
+read time (fan-out-on-read) and merged with the materialized rows.
+"""
+import heapq
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Window
+from django.db.models.functions import RowNumber
+
+from .models import Post, TimelineEntry
+
+User = get_user_model()
+Follow = User.followers.through
+
+FANOUT_THRESHOLD = getattr(settings, 'TIMELINE_FANOUT_THRESHOLD', 10_000)
+FANOUT_BATCH_SIZE = getattr(settings, 'TIMELINE_FANOUT_BATCH_SIZE', 1_000)
+# How many of an account's latest posts land in a new follower's timeline
+BACKFILL_SIZE = getattr(settings, 'TIMELINE_BACKFILL_SIZE', 50)
+
+
+def is_fanned_out(author):
+    return author.follower_count <= FANOUT_THRESHOLD
+
+def fan_out_post(post):
+    """
+    Write `post` into its author's and (unless the author is above the
+    threshold) every follower's timeline. Returns the number of entries.
+    """
+    author = post.author
+    owners = [author.pk]
+    if is_fanned_out(author):
+        owners += Follow.objects.filter(from_user=author).values_list('to_user_id', flat=True)
+    entries = [TimelineEntry(owner_id=owner_id, post=post, author=author) for owner_id in owners]
+    TimelineEntry.objects.bulk_create(entries, batch_size=FANOUT_BATCH_SIZE, ignore_conflicts=True)
+    return len(entries)
+
+def backfill_timeline(owner, authors):
+    """
+    Copy each of `authors`' latest posts into `owner`'s timeline after a
+    follow, in one query and one bulk insert however many authors there are.
+    """
+    author_ids = [author.pk for author in authors if is_fanned_out(author)]
+    if not author_ids:
+        return
+    latest = (
+        Post.objects
+        .filter(author_id__in=author_ids)
+        .annotate(rank=Window(RowNumber(), partition_by='author_id', order_by='-id'))
+        .filter(rank__lte=BACKFILL_SIZE)
+        .values_list('id', 'author_id')
+    )
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(owner=owner, post_id=post_id, author_id=author_id) for post_id, author_id in latest],
+        batch_size=FANOUT_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+def purge_timeline(owner, authors):
+    """
+    Drop `authors`' posts from `owner`'s timeline after an unfollow.
+    """
+    TimelineEntry.objects.filter(owner=owner, author__in=[author.pk for author in authors]).delete()
+
+def get_home_timeline(user, limit=20, before=None):
+    """
+    Return up to `limit` posts for `user`'s home feed, newest first.
+    `before` is a post id cursor: only posts older than it are returned.
+    """
+    materialized = TimelineEntry.objects.filter(owner=user)
+    if before is not None:
+        materialized = materialized.filter(post_id__lt=before)
+    post_ids = list(materialized.order_by('-post_id').values_list('post_id', flat=True)[:limit])
+
+    # Followed accounts that skip fan-out; kept small by the threshold
+    pulled_authors = list(
+        Follow.objects
+        .filter(to_user=user, from_user__follower_count__gt=FANOUT_THRESHOLD)
+        .values_list('from_user_id', flat=True)
+    )
+    if pulled_authors:
+        pulled = Post.objects.filter(author_id__in=pulled_authors)
+        if before is not None:
+            pulled = pulled.filter(id__lt=before)
+        pulled_ids = pulled.order_by('-id').values_list('id', flat=True)[:limit]
+        post_ids = heapq.nlargest(limit, set(post_ids).union(pulled_ids))
+
+    return list(Post.objects.filter(id__in=post_ids).select_related('author').order_by('-id'))
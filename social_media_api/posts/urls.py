@@ -0,0 +1,11 @@
+from django.urls import path, include
+from rest_framework import routers
+from .views import PostViewSet, FeedView
+
+router = routers.DefaultRouter()
+router.register(r'posts', PostViewSet, basename='post')
+
+urlpatterns = [
+  path('feed/', FeedView.as_view(), name='feed'),
+  path('', include(router.urls)),
+]
@@ -0,0 +1,42 @@
+from rest_framework import permissions, viewsets
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .models import Post
+from .permissions import IsAuthorOrReadOnly
+from .serializers import PostSerializer
+from .timeline import get_home_timeline
+
+# Create your views here.
+class PostViewSet(viewsets.ModelViewSet):
+    queryset = Post.objects.select_related('author')
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user)
+
+class FeedView(APIView):
+    """
+    Home timeline of the authenticated user. Page with ?before=<post id>
+    using the `next_before` value of the previous response.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+            before = request.query_params.get('before')
+            before = int(before) if before else None
+        except ValueError:
+            return Response({'detail': 'limit and before must be integers.'}, status=400)
+        if limit < 1:
+            return Response({'detail': 'limit must be at least 1.'}, status=400)
+        limit = min(limit, self.max_limit)
+
+        posts = get_home_timeline(request.user, limit=limit, before=before)
+        return Response({
+            'results': PostSerializer(posts, many=True).data,
+            'next_before': posts[-1].id if len(posts) == limit else None,
+        })
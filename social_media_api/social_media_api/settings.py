@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'accounts',
+    'posts',
     'rest_framework.authtoken',
 ]
 
@@ -47,7 +49,7 @@ AUTH_USER_MODEL = 'accounts.User'
 # DRF defaults (token auth)
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -55,6 +57,25 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Token -> user lookups cached by accounts.authentication.CachedTokenAuthentication.
+# Other workers keep accepting a revoked token for up to LOCAL_TTL seconds.
+# CACHE_ALIAS adds a tier shared by all workers; leave it None while the
+# default cache is the per-process LocMemCache, whose stale copies would
+# stretch that window to TTL.
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': 10_000,
+    'LOCAL_TTL': 5,
+    'TTL': 60,
+    'CACHE_ALIAS': None,
+}
+
+# Home timeline: accounts with more followers than this are merged into
+# feeds at read time instead of being fanned out to every follower on write.
+TIMELINE_FANOUT_THRESHOLD = 10_000
+
+# Square profile picture variants rendered by accounts.thumbnails
+PROFILE_THUMBNAIL_SIZES = (48, 128, 512)
+
 # Media (if storing uploaded images locally during development)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -119,6 +140,34 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing profile: 'scrypt' (default), 'argon2' (needs argon2-cffi)
+# or 'pbkdf2' (Django's default). Hashes made by the others keep working and
+# are upgraded to the active profile on the user's next login.
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'scrypt')
+
+_PASSWORD_HASHERS_BY_PROFILE = {
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'accounts.hashers.TunedArgon2PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS_BY_PROFILE[PASSWORD_HASHER_PROFILE]] + [
+    hasher for profile, hasher in _PASSWORD_HASHERS_BY_PROFILE.items()
+    if profile != PASSWORD_HASHER_PROFILE
+]
+
+# Per-algorithm overrides for accounts.hashers, e.g.
+# {'argon2': {'time_cost': 2, 'memory_cost': 19456, 'parallelism': 1}}
+PASSWORD_HASHER_PARAMS = {}
+
+# HashPoolModelBackend is ModelBackend with aauthenticate() on the hash pool
+AUTHENTICATION_BACKENDS = ['accounts.backends.HashPoolModelBackend']
+
+# Serve login/ from the async view and verify passwords on a pool of
+# PASSWORD_HASH_WORKERS threads (None = one per core). Only useful under ASGI.
+PASSWORD_HASH_OFFLOAD = False
+PASSWORD_HASH_WORKERS = None
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 